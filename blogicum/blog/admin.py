@@ -6,8 +6,12 @@ from .models import Location
 from .models import Category
 from .models import Post
 from .models import Comment
+from .models import OutgoingEmail
+from .models import ImageBlob
 
 admin.site.register(Location)
 admin.site.register(Category)
 admin.site.register(Post)
 admin.site.register(Comment)
+admin.site.register(OutgoingEmail)
+admin.site.register(ImageBlob)
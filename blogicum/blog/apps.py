@@ -8,3 +8,8 @@ class BlogConfig(AppConfig):
     name = 'blog'
     # Имя для использования в админ-зоне.
     verbose_name = 'Блог'
+
+    def ready(self):
+        # Подключение обработчиков сигналов, системных проверок
+        # и настройки соединений SQLite.
+        from . import checks, signals, sqlite  # noqa: F401
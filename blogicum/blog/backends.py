@@ -0,0 +1,98 @@
+"""Почтовый бэкенд, отправляющий письма пачками."""
+
+import atexit
+import logging
+from threading import Lock, Timer
+from time import perf_counter
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .metrics import email_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class EmailBatcher:
+    """
+    Общий для процесса буфер писем.
+
+    Буфер сбрасывается, когда в нём набирается EMAIL_BATCH_SIZE писем
+    или когда самое старое письмо ждёт дольше EMAIL_BATCH_MAX_DELAY
+    секунд. Каждая пачка уходит через одно соединение бэкенда
+    EMAIL_BATCH_BACKEND.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._messages = []
+        self._timer = None
+
+    def add(self, messages, fail_silently=False):
+        with self._lock:
+            self._messages.extend(messages)
+            depth = len(self._messages)
+            full = depth >= settings.EMAIL_BATCH_SIZE
+            if not full and self._timer is None:
+                self._timer = Timer(settings.EMAIL_BATCH_MAX_DELAY,
+                                    self.flush, kwargs={'fail_silently': True})
+                self._timer.daemon = True
+                self._timer.start()
+        email_metrics.set_depth(depth)
+        if full:
+            self.flush(fail_silently=fail_silently)
+
+    def flush(self, fail_silently=False):
+        """Отправка накопленных писем; возвращает их количество."""
+        with self._lock:
+            messages, self._messages = self._messages, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        email_metrics.set_depth(0)
+        if not messages:
+            return 0
+        start = perf_counter()
+        try:
+            with get_connection(settings.EMAIL_BATCH_BACKEND) as connection:
+                sent = connection.send_messages(messages) or 0
+        except Exception:
+            email_metrics.record_batch(len(messages), perf_counter() - start,
+                                       error=True)
+            if not fail_silently:
+                raise
+            logger.exception('Не удалось отправить пачку из %d писем.',
+                             len(messages))
+            return 0
+        email_metrics.record_batch(sent, perf_counter() - start)
+        return sent
+
+
+batcher = EmailBatcher()
+# Письма, оставшиеся в буфере, отправляются при завершении процесса.
+atexit.register(batcher.flush, fail_silently=True)
+
+
+class BatchedEmailBackend(BaseEmailBackend):
+    """
+    Бэкенд, копящий письма в общем буфере процесса.
+
+    Вместо отдельного соединения на каждый вызов send_mail письма
+    уходят пачками через одно соединение (см. EmailBatcher).
+
+    send_messages сообщает об успехе, как только письма попали в буфер:
+    ошибки отправки по таймеру только записываются в журнал, а письма
+    из буфера теряются при аварийном завершении процесса. Поэтому
+    бэкенд подходит только для отправки без очереди
+    (EMAIL_QUEUE_ENABLED = False). Обработчик очереди send_queued_mail
+    его не использует и отправляет письма сразу через
+    EMAIL_BATCH_BACKEND, чтобы статус письма отражал настоящий
+    результат (см. blog.mail.delivery_connection).
+    """
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        batcher.add(list(email_messages), fail_silently=self.fail_silently)
+        return len(email_messages)
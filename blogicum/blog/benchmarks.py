@@ -0,0 +1,177 @@
+"""Замеры задержки, числа SQL-запросов и памяти для маршрутов blog."""
+
+import json
+import tracemalloc
+from statistics import median
+from time import perf_counter
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Comment, Post, User
+
+
+def percentile(values, fraction):
+    """Перцентиль по списку значений."""
+    values = sorted(values)
+    return values[round(fraction * (len(values) - 1))]
+
+
+class BenchmarkRunner:
+    """
+    Прогон именованных маршрутов blog/urls.py через тестовый клиент.
+
+    Для каждого маршрута выполняется requests запросов с пустым кэшем
+    (задержка самого представления) и requests запросов с прогретым
+    кэшем; по ним считаются p50/p95 задержки. Число SQL-запросов
+    и пиковая память замеряются отдельным запросом, чтобы tracemalloc
+    не искажал задержку.
+    """
+
+    def __init__(self, requests=20):
+        self.requests = requests
+
+    def client_for(self, user=None):
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        return client
+
+    def routes(self):
+        """Список (имя маршрута, url, клиент) на данных из базы."""
+        post = Post.objects.filter(
+            is_published=True,
+            category__is_published=True,
+            pub_date__lte=timezone.now(),
+        ).select_related('author', 'category').order_by(
+            '-comment_count'
+        ).first()
+        if post is None:
+            raise ValueError('В базе нет опубликованных постов для замеров.')
+        comment = Comment.objects.filter(post=post).select_related(
+            'author'
+        ).first()
+        staff, _ = User.objects.get_or_create(
+            username='benchmark_staff', defaults={'is_staff': True}
+        )
+
+        anonymous = self.client_for()
+        author = self.client_for(post.author)
+        routes = [
+            ('blog:index', reverse('blog:index'), anonymous),
+            ('blog:index (auth)', reverse('blog:index'), author),
+            ('blog:category_posts',
+             reverse('blog:category_posts', args=[post.category.slug]),
+             author),
+            ('blog:post_detail',
+             reverse('blog:post_detail', args=[post.id]), author),
+            ('blog:post_comments',
+             reverse('blog:post_comments', args=[post.id]), author),
+            ('blog:profile',
+             reverse('blog:profile', args=[post.author.username]), author),
+            ('blog:create_post', reverse('blog:create_post'), author),
+            ('blog:edit_post', reverse('blog:edit_post', args=[post.id]),
+             author),
+            ('blog:delete_post', reverse('blog:delete_post', args=[post.id]),
+             author),
+            ('blog:add_comment', reverse('blog:add_comment', args=[post.id]),
+             author),
+            ('blog:edit_profile', reverse('blog:edit_profile'), author),
+            ('blog:metrics', reverse('blog:metrics'),
+             self.client_for(staff)),
+        ]
+        if comment is not None:
+            commenter = self.client_for(comment.author)
+            routes += [
+                ('blog:edit_comment',
+                 reverse('blog:edit_comment', args=[post.id, comment.id]),
+                 commenter),
+                ('blog:delete_comment',
+                 reverse('blog:delete_comment', args=[post.id, comment.id]),
+                 commenter),
+            ]
+        return routes
+
+    def measure(self, url, client):
+        """Замер одного маршрута."""
+        cache.clear()
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+            # Журнал запросов очищается в начале следующего запроса.
+            query_count = len(queries)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        if response.status_code >= 400:
+            raise ValueError(f'{url} вернул {response.status_code}')
+
+        cold = self.timings(client, url, clear_cache=True)
+        warm = self.timings(client, url, clear_cache=False)
+        return {
+            'p50_ms': round(median(cold), 3),
+            'p95_ms': round(percentile(cold, 0.95), 3),
+            'warm_p50_ms': round(median(warm), 3),
+            'warm_p95_ms': round(percentile(warm, 0.95), 3),
+            'queries': query_count,
+            'peak_kb': round(peak / 1024, 1),
+        }
+
+    def timings(self, client, url, clear_cache):
+        """Задержки requests запросов в миллисекундах."""
+        timings = []
+        for _ in range(self.requests):
+            if clear_cache:
+                cache.clear()
+            start = perf_counter()
+            client.get(url)
+            timings.append((perf_counter() - start) * 1000)
+        return timings
+
+    def run(self):
+        """Замеры всех маршрутов: имя маршрута -> метрики."""
+        return {name: self.measure(url, client)
+                for name, url, client in self.routes()}
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_baseline(path, results):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
+
+
+def compare(results, baseline, threshold):
+    """
+    Регрессии относительно эталонных замеров.
+
+    Задержка (p95 с пустым кэшем) и память считаются регрессией при
+    росте больше чем на threshold процентов, число SQL-запросов — при
+    любом росте.
+    """
+    regressions = []
+    for name, metrics in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if metrics['queries'] > previous['queries']:
+            regressions.append(
+                f'{name}: запросов {previous["queries"]} -> '
+                f'{metrics["queries"]}'
+            )
+        for key in ('p95_ms', 'peak_kb'):
+            limit = previous[key] * (1 + threshold / 100)
+            if metrics[key] > limit:
+                regressions.append(
+                    f'{name}: {key} {previous[key]} -> {metrics[key]}'
+                )
+    return regressions
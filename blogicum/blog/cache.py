@@ -0,0 +1,243 @@
+"""Кэширование страниц и шаблонных фрагментов блога."""
+
+from hashlib import md5
+from time import monotonic
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Min
+from django.http import Http404, HttpResponse
+from django.utils import timezone
+
+from .models import Category, Post, User
+
+# Ключ, под которым хранится текущая версия группы кэшированных данных.
+VERSION_KEY = 'blog:version:{}'
+
+# Ключ ближайшей отложенной публикации: (дата или None,).
+NEXT_PUBLICATION_KEY = 'blog:next_publication'
+
+# Кэш категорий внутри процесса: slug -> (категория или None, срок годности).
+_categories = {}
+
+
+def get_versions(*names):
+    """
+    Текущие версии для заданных групп.
+
+    Отсутствующие в кэше версии создаются заново, поэтому потеря ключа
+    версии приводит только к промаху, а не к показу устаревших данных.
+    """
+    keys = [VERSION_KEY.format(name) for name in names]
+    found = cache.get_many(keys)
+    missing = {key: uuid4().hex for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return [found[key] for key in keys]
+
+
+def bump_version(*names):
+    """Смена версий групп: все фрагменты со старыми версиями устаревают."""
+    cache.set_many(
+        {VERSION_KEY.format(name): uuid4().hex for name in names},
+        timeout=None
+    )
+
+
+def post_version_name(post_id):
+    """Имя группы кэша для отдельного поста."""
+    return f'post:{post_id}'
+
+
+def post_card_version(post):
+    """Версия карточки поста с учётом связанных категорий, мест и авторов."""
+    return '.'.join(get_versions(
+        post_version_name(post.pk), 'categories', 'locations', 'users'
+    ))
+
+
+def comments_version_name(post_id):
+    """Имя группы кэша для комментариев поста."""
+    return f'comments:{post_id}'
+
+
+def comment_list_version(post):
+    """Версия списка комментариев поста с учётом имён их авторов."""
+    return '.'.join(get_versions(comments_version_name(post.pk), 'users'))
+
+
+# Поля пользователя, нужные странице профиля. Остальные (в том числе
+# хэш пароля) в общий кэш не попадают.
+PROFILE_FIELDS = ('username', 'first_name', 'last_name', 'date_joined',
+                  'is_staff')
+
+
+def profile_cache_key(username):
+    return f'blog:profile:{username}'
+
+
+def get_profile_or_404(username):
+    """
+    Пользователь по имени или ошибка 404.
+
+    Найденный пользователь с полями PROFILE_FIELDS кэшируется
+    на PROFILE_CACHE_TIMEOUT секунд.
+    """
+    key = profile_cache_key(username)
+    profile = cache.get(key)
+    if profile is None:
+        profile = User.objects.filter(username=username).only(
+            *PROFILE_FIELDS
+        ).first()
+        if profile is None:
+            raise Http404('Пользователь не найден')
+        if settings.PROFILE_CACHE_TIMEOUT:
+            cache.set(key, profile, settings.PROFILE_CACHE_TIMEOUT)
+    return profile
+
+
+def invalidate_profile(username):
+    cache.delete(profile_cache_key(username))
+
+
+def get_published_category_or_404(slug):
+    """
+    Опубликованная категория по slug или ошибка 404.
+
+    Категорий мало и меняются они редко, поэтому результат (в том числе
+    отсутствие категории) хранится в памяти процесса. Сохранение категории
+    сбрасывает кэш через сигнал, а CATEGORY_CACHE_TIMEOUT ограничивает
+    устаревание в других процессах.
+    """
+    entry = _categories.get(slug)
+    if entry is None or entry[1] < monotonic():
+        category = Category.objects.filter(slug=slug,
+                                           is_published=True).first()
+        entry = (category, monotonic() + settings.CATEGORY_CACHE_TIMEOUT)
+        _categories[slug] = entry
+    if entry[0] is None:
+        raise Http404('Категория не найдена')
+    return entry[0]
+
+
+def invalidate_categories():
+    _categories.clear()
+
+
+def invalidate_all():
+    """Сброс всех кэшей блога после массовых изменений без сигналов."""
+    invalidate_categories()
+    invalidate_schedule()
+    bump_version('posts', 'categories', 'locations', 'users', 'schedule')
+
+
+def next_publication():
+    """
+    Дата ближайшей отложенной публикации или None.
+
+    Дата хранится в кэше, поэтому агрегат по постам считается только
+    после изменения постов (см. invalidate_schedule) или когда эта дата
+    наступила. В последнем случае версия группы 'schedule' меняется:
+    страницы, зависящие от даты публикации, устаревают ровно на границе,
+    даже если их срок жизни рассчитан по устаревшей дате.
+    """
+    now = timezone.now()
+    entry = cache.get(NEXT_PUBLICATION_KEY)
+    if entry is not None:
+        if entry[0] is None or entry[0] > now:
+            return entry[0]
+        bump_version('schedule')
+    next_pub_date = Post.objects.filter(
+        is_published=True, pub_date__gt=now
+    ).aggregate(next_pub_date=Min('pub_date'))['next_pub_date']
+    # Срок жизни ограничивает устаревание после изменений без сигналов.
+    cache.set(NEXT_PUBLICATION_KEY, (next_pub_date,),
+              settings.PAGE_CACHE_TIMEOUT)
+    return next_pub_date
+
+
+def invalidate_schedule():
+    cache.delete(NEXT_PUBLICATION_KEY)
+
+
+def seconds_until_next_publication():
+    """
+    Время до ближайшей отложенной публикации в секундах.
+
+    Возвращает None, если отложенных публикаций нет.
+    """
+    next_pub_date = next_publication()
+    if next_pub_date is None:
+        return None
+    seconds = (next_pub_date - timezone.now()).total_seconds()
+    return max(int(seconds) + 1, 1)
+
+
+class AnonymousCacheMixin:
+    """
+    Миксин, кэширующий страницу целиком для анонимных посетителей.
+
+    Ключ страницы содержит версии групп из cache_tags, поэтому сброс
+    выполняется сменой версии группы (см. bump_version). Страницы,
+    зависящие от отложенных постов, живут не дольше, чем до ближайшей
+    публикации.
+    """
+
+    cache_tags = ()
+    # Страница зависит от даты публикации постов.
+    cache_until_next_publication = False
+
+    def get_cache_tags(self):
+        if self.cache_until_next_publication:
+            return (*self.cache_tags, 'schedule')
+        return self.cache_tags
+
+    def is_page_cacheable(self, request):
+        """Кэшируются только GET-запросы анонимных посетителей."""
+        return (request.method in ('GET', 'HEAD')
+                and not request.user.is_authenticated)
+
+    def get_page_cache_key(self, request):
+        if self.cache_until_next_publication:
+            # Если дата публикации наступила, здесь сменится версия
+            # 'schedule' и страница из кэша не будет отдана.
+            next_publication()
+        versions = get_versions(*self.get_cache_tags())
+        path = md5(request.get_full_path().encode()).hexdigest()
+        return f'blog:page:{path}:{".".join(versions)}'
+
+    def get_page_cache_timeout(self):
+        timeout = settings.PAGE_CACHE_TIMEOUT
+        if self.cache_until_next_publication:
+            next_publication = seconds_until_next_publication()
+            if next_publication is not None:
+                timeout = min(timeout, next_publication)
+        return timeout
+
+    def dispatch(self, request, *args, **kwargs):
+        """Отдача страницы из кэша или её сохранение после отрисовки."""
+        if not self.is_page_cacheable(request):
+            return super().dispatch(request, *args, **kwargs)
+        key = self.get_page_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = super().dispatch(request, *args, **kwargs)
+        if (response.status_code == 200
+                and hasattr(response, 'add_post_render_callback')):
+            response.add_post_render_callback(
+                lambda rendered: self.store_page(request, rendered, key)
+            )
+        return response
+
+    def store_page(self, request, response, key):
+        """Сохранение отрисованной страницы, если она не персональная."""
+        # Страницы с CSRF-токеном или cookie нельзя отдавать другим.
+        if request.META.get('CSRF_COOKIE_NEEDS_UPDATE') or response.cookies:
+            return
+        cache.set(key, (response.content, response['Content-Type']),
+                  self.get_page_cache_timeout())
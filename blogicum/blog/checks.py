@@ -0,0 +1,30 @@
+"""Системные проверки настроек блога."""
+
+from django.conf import settings
+from django.core.checks import Warning, register
+
+# Бэкенды кэша, данные которых видны только текущему процессу.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Версии кэша (blog.cache.bump_version) должны быть общими для процессов.
+
+    С кэшем в памяти процесса изменение поста в одном процессе не сбросит
+    карточки и страницы, закэшированные другими процессами.
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        f'Кэш по умолчанию ({backend}) не общий для процессов: сброс '
+        'кэша блога работает только внутри одного процесса.',
+        hint='Используйте общий кэш (Redis, Memcached, база данных) при '
+             'запуске нескольких процессов.',
+        id='blog.W001',
+    )]
@@ -1,8 +1,12 @@
 """Формы для взаимодействия в блоге."""
 
 from django import forms
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import PasswordResetForm, UserCreationForm
+from django.template import loader
 
+from .images import image_size, schedule_variants
+from .mail import enqueue_mail
+from .uploads import SafeImageField
 from .models import Post, Comment, User
 
 
@@ -12,6 +16,7 @@ class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         exclude = ('author',)
+        field_classes = {'image': SafeImageField}
         widgets = {
             'pub_date': forms.DateTimeInput(attrs={
                 'type': 'datetime-local',
@@ -19,6 +24,29 @@ class PostForm(forms.ModelForm):
             }),
         }
 
+    def save(self, commit=True):
+        """
+        Сохранение поста; для нового изображения строятся копии.
+
+        Размеры берутся из изображения, уже открытого при проверке формы,
+        чтобы при выводе поста не читать файл.
+        """
+        image_changed = 'image' in self.changed_data
+        if image_changed:
+            # Прежний файл и его копии могут использовать другие посты:
+            # их удалит gc_images, когда ссылок не останется.
+            self.instance.image_meta = {}
+            uploaded = getattr(self.cleaned_data.get('image'), 'image', None)
+            if uploaded is not None:
+                width, height = image_size(uploaded)
+                self.instance.image_meta = {'width': width, 'height': height}
+        post = super().save(commit)
+        if commit and image_changed and post.image:
+            # Очищенная временная копия уже перенесена в хранилище.
+            self.cleaned_data['image'].close()
+            schedule_variants(post.pk)
+        return post
+
 
 class UserForm(forms.ModelForm):
     """Форма для профиля пользователя."""
@@ -42,3 +70,22 @@ class CommentForm(forms.ModelForm):
     class Meta:
         model = Comment
         fields = ('text',)
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    """Форма сброса пароля, ставящая письмо в очередь."""
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        subject = loader.render_to_string(subject_template_name, context)
+        # Тема письма не должна содержать переводов строк.
+        subject = ''.join(subject.splitlines())
+        body = loader.render_to_string(email_template_name, context)
+        html_message = None
+        if html_email_template_name is not None:
+            html_message = loader.render_to_string(
+                html_email_template_name, context
+            )
+        enqueue_mail(subject, body, from_email, [to_email],
+                     html_message=html_message)
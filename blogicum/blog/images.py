@@ -0,0 +1,170 @@
+"""Уменьшенные копии изображений постов."""
+
+import atexit
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import PurePosixPath
+from threading import Lock
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from PIL import features, Image, ImageOps
+
+from .cache import bump_version, post_version_name
+from .models import Post
+
+# Тег EXIF с ориентацией снимка.
+ORIENTATION = 0x0112
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = Lock()
+
+
+def webp_supported():
+    """Поддерживает ли установленный Pillow запись WebP."""
+    return features.check('webp')
+
+
+def variant_name(name, variant, extension):
+    """Имя файла копии рядом с оригиналом: photo.jpg -> photo.thumb.jpg."""
+    path = PurePosixPath(name)
+    return str(path.with_name(f'{path.stem}.{variant}.{extension}'))
+
+
+def image_size(image):
+    """Размеры изображения с учётом поворота из EXIF."""
+    width, height = image.size
+    # Ориентации 5–8 означают поворот на 90 или 270 градусов.
+    if image.getexif().get(ORIENTATION, 1) in (5, 6, 7, 8):
+        return height, width
+    return width, height
+
+
+def encode(image, image_format):
+    buffer = BytesIO()
+    if image_format == 'WEBP':
+        image.save(buffer, 'WEBP', quality=settings.IMAGE_VARIANT_QUALITY,
+                   method=4)
+    else:
+        image.save(buffer, 'JPEG', quality=settings.IMAGE_VARIANT_QUALITY,
+                   optimize=True, progressive=True)
+    return ContentFile(buffer.getvalue())
+
+
+def save_file(name, content):
+    """Сохранение файла под заданным именем с заменой прежнего."""
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    return default_storage.save(name, content)
+
+
+def build_variants(name):
+    """
+    Создание копий изображения для каждого размера IMAGE_VARIANTS.
+
+    Каждая копия сохраняется в JPEG и, если Pillow это умеет, в WebP.
+    Изображение не увеличивается: для маленького оригинала копия
+    только пережимается. Возвращает размеры оригинала и описание копий
+    для Post.image_meta.
+    """
+    with default_storage.open(name, 'rb') as file:
+        with Image.open(file) as original:
+            original = ImageOps.exif_transpose(original)
+            original.load()
+    if original.mode not in ('RGB', 'L'):
+        original = original.convert('RGB')
+    formats = {'jpg': 'JPEG'}
+    if webp_supported():
+        formats['webp'] = 'WEBP'
+    variants = {}
+    for variant, max_width in settings.IMAGE_VARIANTS.items():
+        image = original.copy()
+        image.thumbnail((max_width, max_width * 4), Image.Resampling.LANCZOS)
+        files = {
+            extension: save_file(variant_name(name, variant, extension),
+                                 encode(image, image_format))
+            for extension, image_format in formats.items()
+        }
+        variants[variant] = {
+            'width': image.width,
+            'height': image.height,
+            'files': files,
+        }
+    return {
+        'width': original.width,
+        'height': original.height,
+        'variants': variants,
+    }
+
+
+def generate_variants(post_id):
+    """
+    Создание копий изображения поста и запись их в image_meta.
+
+    Файлы хранятся по хешу содержимого, поэтому у постов с одинаковым
+    изображением общие копии: готовые берутся у другого поста.
+    """
+    post = Post.objects.filter(pk=post_id).only('image', 'image_meta').first()
+    if post is None or not post.image:
+        return
+    shared = Post.objects.filter(
+        image=post.image.name, image_meta__has_key='variants'
+    ).exclude(pk=post_id).values_list('image_meta', flat=True).first()
+    if shared is not None and set(shared['variants']) == set(
+            settings.IMAGE_VARIANTS):
+        meta = shared
+    else:
+        meta = build_variants(post.image.name)
+    # Условие на image: если за время обработки загрузили другое
+    # изображение, устаревшие копии не записываются.
+    updated = Post.objects.filter(pk=post_id, image=post.image.name).update(
+        image_meta={**post.image_meta, **meta}
+    )
+    if updated:
+        bump_version(post_version_name(post_id), 'posts')
+
+
+def _run_in_background(post_id):
+    try:
+        generate_variants(post_id)
+    except Exception:
+        # Результат задачи из пула никто не ждёт: без записи в журнал
+        # ошибка (битый файл, сбой хранилища) потерялась бы.
+        logger.exception('Не удалось создать копии изображения поста %s.',
+                         post_id)
+    finally:
+        # У каждого потока своё соединение с базой.
+        connections.close_all()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_VARIANT_WORKERS,
+                thread_name_prefix='image-variants',
+            )
+            atexit.register(_executor.shutdown)
+    return _executor
+
+
+def schedule_variants(post_id):
+    """
+    Создание копий после фиксации транзакции.
+
+    При IMAGE_VARIANTS_ASYNC копии строятся в фоновом пуле потоков,
+    иначе — сразу, в текущем потоке.
+    """
+    def run():
+        if settings.IMAGE_VARIANTS_ASYNC:
+            get_executor().submit(_run_in_background, post_id)
+        else:
+            generate_variants(post_id)
+
+    transaction.on_commit(run)
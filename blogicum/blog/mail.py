@@ -0,0 +1,146 @@
+"""Очередь исходящих писем и их доставка."""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection, send_mail
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+def enqueue_mail(subject, message, from_email, recipient_list,
+                 html_message=None):
+    """
+    Постановка письма в очередь вместо отправки в рамках запроса.
+
+    При выключенной настройке EMAIL_QUEUE_ENABLED письмо отправляется
+    сразу, как раньше.
+    """
+    if not settings.EMAIL_QUEUE_ENABLED:
+        send_mail(subject, message, from_email, recipient_list,
+                  html_message=html_message)
+        return None
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=message,
+        html_body=html_message or '',
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=','.join(recipient_list),
+    )
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    return min(settings.EMAIL_QUEUE_RETRY_DELAY * 2 ** (attempts - 1),
+               settings.EMAIL_QUEUE_MAX_RETRY_DELAY)
+
+
+def claim_batch(batch_size):
+    """
+    Захват писем, готовых к отправке.
+
+    Захваченное письмо получает статус «Отправляется» и срок аренды
+    в next_attempt_at: если обработчик упадёт, письмо снова станет
+    доступным после истечения аренды. Каждое письмо захватывается
+    условным UPDATE, поэтому два обработчика не отправят его дважды.
+    """
+    now = timezone.now()
+    lease_until = now + timedelta(seconds=settings.EMAIL_QUEUE_LEASE)
+    candidates = OutgoingEmail.objects.filter(
+        status__in=(OutgoingEmail.PENDING, OutgoingEmail.SENDING),
+        next_attempt_at__lte=now,
+    ).order_by('next_attempt_at', 'pk')[:batch_size]
+    claimed = []
+    for email in candidates:
+        updated = OutgoingEmail.objects.filter(
+            pk=email.pk,
+            status=email.status,
+            next_attempt_at=email.next_attempt_at,
+        ).update(status=OutgoingEmail.SENDING, next_attempt_at=lease_until)
+        if updated:
+            claimed.append(email)
+    return claimed
+
+
+# Бэкенд, который только буферизует письма (см. blog.backends).
+BATCHED_BACKEND = 'blog.backends.BatchedEmailBackend'
+
+
+def delivery_connection():
+    """
+    Соединение, которое отправляет письма сразу.
+
+    Буферизующий бэкенд сообщает об успехе до настоящей отправки, и
+    письмо из очереди было бы помечено отправленным без доставки,
+    поэтому вместо него берётся бэкенд, через который он отправляет.
+    """
+    if settings.EMAIL_BACKEND == BATCHED_BACKEND:
+        return get_connection(settings.EMAIL_BATCH_BACKEND)
+    return get_connection()
+
+
+def deliver(email, connection=None):
+    """Отправка одного письма; исключения не перехватываются."""
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.recipients.split(','),
+        connection=connection or delivery_connection(),
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    message.send()
+
+
+def deliver_many(emails):
+    """
+    Отправка писем через одно соединение бэкенда.
+
+    Возвращает пары (письмо, ошибка или None).
+    """
+    connection = delivery_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        return [(email, error) for email in emails]
+    results = []
+    try:
+        for email in emails:
+            try:
+                deliver(email, connection)
+            except Exception as error:
+                results.append((email, error))
+            else:
+                results.append((email, None))
+    finally:
+        connection.close()
+    return results
+
+
+def mark_sent(email):
+    OutgoingEmail.objects.filter(pk=email.pk).update(
+        status=OutgoingEmail.SENT,
+        attempts=email.attempts + 1,
+        sent_at=timezone.now(),
+        last_error='',
+    )
+
+
+def mark_failed(email, error, max_attempts):
+    """Перенос письма на следующую попытку или отметка о неудаче."""
+    attempts = email.attempts + 1
+    if attempts >= max_attempts:
+        status, next_attempt_at = OutgoingEmail.FAILED, timezone.now()
+    else:
+        status = OutgoingEmail.PENDING
+        next_attempt_at = timezone.now() + timedelta(
+            seconds=retry_delay(attempts)
+        )
+    OutgoingEmail.objects.filter(pk=email.pk).update(
+        status=status,
+        attempts=attempts,
+        next_attempt_at=next_attempt_at,
+        last_error=f'{type(error).__name__}: {error}',
+    )
@@ -0,0 +1,97 @@
+"""Замеры производительности маршрутов блога на синтетических данных."""
+
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+
+from blog.benchmarks import (BenchmarkRunner, compare, load_baseline,
+                             save_baseline)
+from blog.seeding import BlogSeeder
+
+
+class Command(BaseCommand):
+    help = ('Наполняет тестовую базу синтетическими данными и замеряет '
+            'p50/p95 задержки (с пустым и прогретым кэшем), число '
+            'SQL-запросов и пиковую память для каждого маршрута blog.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--locations', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--requests', type=int, default=20,
+            help='Количество запросов к каждому маршруту.'
+        )
+        parser.add_argument(
+            '--no-seed', action='store_true',
+            help='Замерять на текущей базе без создания тестовой.'
+        )
+        parser.add_argument(
+            '--baseline', type=Path,
+            help='JSON-файл с эталонными замерами для сравнения.'
+        )
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Сохранить результаты в файл --baseline.'
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=20,
+            help='Допустимый рост задержки и памяти в процентах.'
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment(debug=False)
+        old_name = connection.settings_dict['NAME']
+        try:
+            if not options['no_seed']:
+                connection.creation.create_test_db(verbosity=0,
+                                                   autoclobber=True)
+                counts = BlogSeeder(
+                    users=options['users'],
+                    categories=options['categories'],
+                    locations=options['locations'],
+                    posts=options['posts'],
+                    comments=options['comments'],
+                    seed=options['seed'],
+                ).run()
+                self.stdout.write(f'Создано: {counts}')
+            try:
+                results = BenchmarkRunner(options['requests']).run()
+            except ValueError as error:
+                raise CommandError(error)
+        finally:
+            if not options['no_seed']:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(
+            f'{"маршрут":<24}{"p50, мс":>10}{"p95, мс":>10}'
+            f'{"p50 кэш":>10}{"p95 кэш":>10}{"SQL":>6}{"память, КБ":>12}'
+        )
+        for name, metrics in results.items():
+            self.stdout.write(
+                f'{name:<24}{metrics["p50_ms"]:>10}{metrics["p95_ms"]:>10}'
+                f'{metrics["warm_p50_ms"]:>10}{metrics["warm_p95_ms"]:>10}'
+                f'{metrics["queries"]:>6}{metrics["peak_kb"]:>12}'
+            )
+
+        baseline_path = options['baseline']
+        if baseline_path is None:
+            return
+        if options['save_baseline']:
+            save_baseline(baseline_path, results)
+            self.stdout.write(f'Эталон сохранён в {baseline_path}')
+            return
+        if not baseline_path.exists():
+            raise CommandError(f'Файл {baseline_path} не найден.')
+        regressions = compare(results, load_baseline(baseline_path),
+                              options['threshold'])
+        if regressions:
+            raise CommandError('Регрессии:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('Регрессий не найдено.'))
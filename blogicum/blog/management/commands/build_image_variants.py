@@ -0,0 +1,29 @@
+"""Создание уменьшенных копий изображений постов."""
+
+from django.core.management.base import BaseCommand
+
+from blog.images import generate_variants
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Создаёт уменьшенные копии изображений постов, у которых '
+            'их ещё нет (например, загруженных до появления копий).')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересоздать копии у всех постов с изображением.'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='')
+        if not options['all']:
+            posts = posts.filter(image_meta__variants__isnull=True)
+        built = 0
+        for pk in posts.order_by('pk').values_list('pk', flat=True).iterator():
+            generate_variants(pk)
+            built += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {built}'
+        ))
@@ -0,0 +1,86 @@
+"""Потоковая выгрузка содержимого блога в JSONL."""
+
+import sys
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from blog.models import Category, Comment, Location, Post
+from blog.streaming import export_jsonl, open_fixture
+
+# Модели в порядке зависимостей, чтобы файл можно было загрузить обратно.
+MODELS = {
+    'category': Category,
+    'location': Location,
+    'post': Post,
+    'comment': Comment,
+}
+
+
+def parse_since(value):
+    """Разбор даты или даты и времени для --since."""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class Command(BaseCommand):
+    help = ('Выгружает категории, местоположения, посты и комментарии '
+            'в JSONL (формат фикстур Django) пачками по первичному ключу. '
+            'Пользователи не выгружаются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-o', '--output',
+            help='Файл для записи; .gz сжимается. По умолчанию stdout.'
+        )
+        parser.add_argument(
+            '--since',
+            help='Выгрузить только объекты, добавленные начиная с этой '
+                 'даты (ГГГГ-ММ-ДД или ISO 8601), по полю created_at.'
+        )
+        parser.add_argument(
+            '--models', nargs='+', choices=list(MODELS), default=list(MODELS),
+            help='Выгружаемые модели.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Количество объектов в одном запросе к базе.'
+        )
+
+    def handle(self, *args, **options):
+        querysets = []
+        for name in MODELS:
+            if name not in options['models']:
+                continue
+            queryset = MODELS[name].objects.all()
+            if options['since']:
+                try:
+                    since = parse_since(options['since'])
+                except ValueError:
+                    raise CommandError(
+                        f'Неверная дата --since: {options["since"]}'
+                    )
+                queryset = queryset.filter(created_at__gte=since)
+            querysets.append(queryset)
+
+        if options['output']:
+            with open_fixture(options['output'], 'w') as stream:
+                counts = export_jsonl(stream, querysets,
+                                      options['chunk_size'])
+        else:
+            counts = export_jsonl(sys.stdout, querysets,
+                                  options['chunk_size'])
+        self.stderr.write(
+            'Выгружено: '
+            + ', '.join(f'{label} — {count}'
+                        for label, count in counts.items())
+        )
@@ -0,0 +1,69 @@
+"""Удаление файлов изображений, на которые не ссылается ни один пост."""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from blog.models import ImageBlob, Post
+from blog.storage import delete_blob_files, image_storage
+
+
+class Command(BaseCommand):
+    help = ('Удаляет пачками файлы изображений без ссылок из постов '
+            'вместе с их уменьшенными копиями.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Количество файлов, проверяемых за один проход.'
+        )
+        parser.add_argument(
+            '--grace', type=int, default=settings.IMAGE_BLOB_GC_GRACE,
+            help=('Сколько секунд файл без ссылок хранится после '
+                  'последнего использования.')
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, сколько файлов будет удалено.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        cutoff = timezone.now() - timedelta(seconds=options['grace'])
+        storage = image_storage()
+        unreferenced = ImageBlob.objects.filter(
+            refcount=0, touched_at__lte=cutoff
+        )
+        last_pk = 0
+        deleted = repaired = 0
+        while True:
+            # Диапазоны по первичному ключу вместо OFFSET.
+            blobs = dict(unreferenced.filter(pk__gt=last_pk).order_by(
+                'pk').values_list('name', 'pk')[:batch_size])
+            if not blobs:
+                break
+            last_pk = max(blobs.values())
+            # Счётчик мог разойтись с данными (например, после update()
+            # без сигналов): такие файлы не удаляются, счётчик чинится.
+            references = Post.objects.filter(
+                image__in=blobs
+            ).order_by().values_list('image').annotate(total=Count('pk'))
+            for name, total in references:
+                pk = blobs.pop(name)
+                if not options['dry_run']:
+                    ImageBlob.objects.filter(pk=pk).update(refcount=total)
+                repaired += 1
+            for name, pk in blobs.items():
+                if options['dry_run']:
+                    deleted += 1
+                    continue
+                # Условие повторяется: файл могли снова загрузить.
+                if unreferenced.filter(pk=pk).delete()[0]:
+                    delete_blob_files(storage, name)
+                    deleted += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено файлов: {deleted}, исправлено счётчиков: {repaired}'
+        ))
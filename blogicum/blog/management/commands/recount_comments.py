@@ -0,0 +1,55 @@
+"""Пересчёт хранимого количества комментариев у постов."""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.cache import bump_version, post_version_name
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает поле comment_count у постов пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество постов, обновляемых в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        counts = Comment.objects.filter(post=OuterRef('pk')).order_by(
+        ).values('post').annotate(total=Count('pk')).values('total')
+        last_pk = 0
+        fixed = 0
+        while True:
+            # Диапазоны по первичному ключу вместо OFFSET.
+            pks = list(Post.objects.filter(pk__gt=last_pk).order_by(
+                'pk').values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            with transaction.atomic():
+                stale = Post.objects.filter(
+                    pk__in=pks
+                ).annotate(
+                    actual=Coalesce(Subquery(counts), 0)
+                ).exclude(comment_count=F('actual')).values_list(
+                    'pk', 'actual'
+                )
+                fixed_pks = []
+                for pk, actual in stale:
+                    Post.objects.filter(pk=pk).update(comment_count=actual)
+                    fixed_pks.append(pk)
+            # update() не вызывает сигналы, поэтому карточки
+            # исправленных постов сбрасываются здесь.
+            if fixed_pks:
+                bump_version(*map(post_version_name, fixed_pks))
+                fixed += len(fixed_pks)
+            last_pk = pks[-1]
+        if fixed:
+            bump_version('posts')
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено счётчиков комментариев: {fixed}'
+        ))
@@ -0,0 +1,66 @@
+"""Наполнение базы синтетическими данными блога."""
+
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from blog.cache import invalidate_all
+from blog.seeding import BlogSeeder
+
+
+class Command(BaseCommand):
+    help = ('Создаёт пользователей, категории, места, посты и комментарии '
+            'с правдоподобными распределениями через bulk_create.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--locations', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора: одинаковое зерно даёт одинаковые данные.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Количество объектов в одном INSERT.'
+        )
+        parser.add_argument(
+            '--future-ratio', type=float, default=0.02,
+            help='Доля отложенных постов.'
+        )
+        parser.add_argument(
+            '--unpublished-ratio', type=float, default=0.03,
+            help='Доля постов, снятых с публикации.'
+        )
+        parser.add_argument(
+            '--unpublished-category-ratio', type=float, default=0.1,
+            help='Доля скрытых категорий.'
+        )
+        parser.add_argument(
+            '--unpublished-location-ratio', type=float, default=0.1,
+            help='Доля скрытых местоположений.'
+        )
+
+    def handle(self, *args, **options):
+        start = perf_counter()
+        counts = BlogSeeder(
+            users=options['users'],
+            categories=options['categories'],
+            locations=options['locations'],
+            posts=options['posts'],
+            comments=options['comments'],
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+            future_ratio=options['future_ratio'],
+            unpublished_ratio=options['unpublished_ratio'],
+            unpublished_category_ratio=options['unpublished_category_ratio'],
+            unpublished_location_ratio=options['unpublished_location_ratio'],
+        ).run()
+        # bulk_create не отправляет сигналы, поэтому кэш сбрасывается здесь.
+        invalidate_all()
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано за {perf_counter() - start:.1f} с: '
+            + ', '.join(f'{name} — {count}' for name, count in counts.items())
+        ))
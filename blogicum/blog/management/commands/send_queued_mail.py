@@ -0,0 +1,72 @@
+"""Отправка писем из очереди исходящей почты."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.mail import claim_batch, deliver_many, mark_failed, mark_sent
+
+
+class Command(BaseCommand):
+    help = ('Отправляет письма из очереди пулом потоков; неудачные '
+            'попытки повторяются с экспоненциальной задержкой.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Количество потоков отправки.'
+        )
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--max-attempts', type=int,
+            default=settings.EMAIL_QUEUE_MAX_ATTEMPTS,
+            help='Число попыток, после которого письмо считается '
+                 'неотправленным.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, опрашивая очередь.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза между опросами пустой очереди (сек).'
+        )
+
+    def handle(self, *args, **options):
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            while True:
+                sent, failed = self.process_batch(pool, options)
+                if sent or failed:
+                    self.stdout.write(
+                        f'Отправлено: {sent}, ошибок: {failed}'
+                    )
+                    continue
+                if not options['loop']:
+                    return
+                time.sleep(options['interval'])
+
+    def process_batch(self, pool, options):
+        """
+        Отправка одной пачки писем.
+
+        Пачка делится между потоками, каждый поток отправляет свою часть
+        через одно соединение с почтовым сервером. Статусы в базе
+        обновляются в основном потоке, чтобы не открывать соединение
+        с базой на каждый поток.
+        """
+        emails = claim_batch(options['batch_size'])
+        workers = options['workers']
+        futures = [pool.submit(deliver_many, emails[index::workers])
+                   for index in range(min(workers, len(emails)))]
+        sent = failed = 0
+        for email, error in (result for future in futures
+                             for result in future.result()):
+            if error is None:
+                mark_sent(email)
+                sent += 1
+            else:
+                mark_failed(email, error, options['max_attempts'])
+                failed += 1
+        return sent, failed
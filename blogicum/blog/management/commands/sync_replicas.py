@@ -0,0 +1,26 @@
+"""Копирование основной базы SQLite в базы-реплики."""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = ('Копирует основную базу SQLite в реплики DATABASE_REPLICAS '
+            'для локальной проверки чтения из реплик.')
+
+    def handle(self, *args, **options):
+        source = connections[DEFAULT_DB_ALIAS]
+        aliases = [source.alias, *settings.DATABASE_REPLICAS]
+        if any(connections[alias].vendor != 'sqlite' for alias in aliases):
+            raise CommandError('Копирование поддерживается только для SQLite.')
+        source.ensure_connection()
+        for alias in settings.DATABASE_REPLICAS:
+            target = connections[alias]
+            target.ensure_connection()
+            # Онлайн-копия: основная база остаётся доступной.
+            source.connection.backup(target.connection)
+            self.stdout.write(f'{alias}: скопировано')
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено реплик: {len(settings.DATABASE_REPLICAS)}'
+        ))
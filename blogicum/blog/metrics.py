@@ -0,0 +1,144 @@
+"""Сбор метрик запросов: число и время SQL, отрисовка шаблонов, задержка."""
+
+from collections import defaultdict, deque
+from threading import Lock
+from time import perf_counter
+
+from django.conf import settings
+
+# Метрики, которые записываются для каждого запроса.
+FIELDS = ('total', 'sql_time', 'sql_count', 'template')
+
+
+class RequestMetrics:
+    """Метрики одного запроса."""
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template = 0.0
+        self._template_start = None
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """Обёртка для connection.execute_wrapper, считающая SQL-запросы."""
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += perf_counter() - start
+            self.sql_count += 1
+
+    def template_started(self):
+        self._template_start = perf_counter()
+
+    def template_finished(self, response):
+        if self._template_start is not None:
+            self.template += perf_counter() - self._template_start
+            self._template_start = None
+
+
+def percentile(values, fraction):
+    """Перцентиль по отсортированному списку значений."""
+    if not values:
+        return None
+    return values[round(fraction * (len(values) - 1))]
+
+
+class MetricsRegistry:
+    """
+    Скользящая гистограмма метрик по представлениям.
+
+    Для каждого представления хранится METRICS_WINDOW последних запросов,
+    поэтому объём памяти ограничен числом маршрутов.
+    """
+
+    def __init__(self, window=None):
+        self._window = window
+        self._lock = Lock()
+        self._samples = defaultdict(self._new_window)
+
+    def _new_window(self):
+        return deque(maxlen=self._window or settings.METRICS_WINDOW)
+
+    def record(self, view_name, total, metrics):
+        sample = (total, metrics.sql_time, metrics.sql_count,
+                  metrics.template)
+        with self._lock:
+            self._samples[view_name].append(sample)
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def summary(self):
+        """Сводка p50/p95/max по каждой метрике каждого представления."""
+        with self._lock:
+            samples = {name: list(window)
+                       for name, window in self._samples.items()}
+        result = {}
+        for name, rows in samples.items():
+            stats = {'requests': len(rows)}
+            for index, field in enumerate(FIELDS):
+                values = sorted(row[index] for row in rows)
+                stats[field] = {
+                    'p50': percentile(values, 0.5),
+                    'p95': percentile(values, 0.95),
+                    'max': values[-1],
+                }
+            result[name] = stats
+        return result
+
+
+class EmailMetrics:
+    """Глубина буфера писем и задержка отправки пачек."""
+
+    def __init__(self, window=None):
+        self._window = window
+        self._lock = Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.depth = 0
+            self.max_depth = 0
+            self.sent = 0
+            self.errors = 0
+            self._batches = deque(
+                maxlen=self._window or settings.METRICS_WINDOW
+            )
+
+    def set_depth(self, depth):
+        with self._lock:
+            self.depth = depth
+            self.max_depth = max(self.max_depth, depth)
+
+    def record_batch(self, size, latency, error=False):
+        with self._lock:
+            self._batches.append((size, latency))
+            if error:
+                self.errors += 1
+            else:
+                self.sent += size
+
+    def summary(self):
+        with self._lock:
+            batches = list(self._batches)
+            stats = {
+                'depth': self.depth,
+                'max_depth': self.max_depth,
+                'sent': self.sent,
+                'errors': self.errors,
+                'batches': len(batches),
+            }
+        for index, field in enumerate(('batch_size', 'latency')):
+            values = sorted(batch[index] for batch in batches)
+            stats[field] = {
+                'p50': percentile(values, 0.5),
+                'p95': percentile(values, 0.95),
+                'max': values[-1] if values else None,
+            }
+        return stats
+
+
+registry = MetricsRegistry()
+email_metrics = EmailMetrics()
@@ -0,0 +1,88 @@
+"""Промежуточные слои (middleware) приложения blog."""
+
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import RequestMetrics, registry
+from .routers import replica_reads
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class RequestMetricsMiddleware:
+    """
+    Измерение числа и времени SQL-запросов, отрисовки шаблонов и общей
+    задержки запроса.
+
+    Результаты передаются в заголовке Server-Timing и накапливаются
+    в скользящей гистограмме blog.metrics.registry.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        request.metrics = metrics
+        start = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(metrics.execute_wrapper)
+                )
+            response = self.get_response(request)
+        total = perf_counter() - start
+
+        match = request.resolver_match
+        registry.record(match.view_name if match else None, total, metrics)
+        response['Server-Timing'] = (
+            f'db;dur={metrics.sql_time * 1000:.1f};'
+            f'desc="{metrics.sql_count} queries", '
+            f'tpl;dur={metrics.template * 1000:.1f}, '
+            f'total;dur={total * 1000:.1f}'
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        """Замер времени отрисовки шаблона ответа."""
+        request.metrics.template_started()
+        response.add_post_render_callback(request.metrics.template_finished)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Включение чтения из реплик для представлений с use_replicas.
+
+    После запроса на запись (POST и т. п.) посетитель получает cookie
+    REPLICA_PIN_COOKIE и REPLICA_PIN_SECONDS секунд читает из основной
+    базы: так он сразу видит свой пост или комментарий, даже если
+    реплика ещё не догнала основную базу.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = replica_reads.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            replica_reads.reset(token)
+        if request.method not in SAFE_METHODS and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        if (getattr(view_class, 'use_replicas', False)
+                and request.method in SAFE_METHODS
+                and settings.REPLICA_PIN_COOKIE not in request.COOKIES):
+            replica_reads.set(True)
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.19 on 2026-10-18 18:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Уменьшенные копии изображения и их размеры.', verbose_name='Сведения об изображении'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.19 on 2026-10-18 18:42
+
+import blog.storage
+from django.db import migrations, models
+from django.db.models import Count
+import django.utils.timezone
+
+
+def register_images(apps, schema_editor):
+    # Изображения, загруженные до хранилища по хешу, учитываются
+    # под прежними именами.
+    Post = apps.get_model('blog', 'Post')
+    ImageBlob = apps.get_model('blog', 'ImageBlob')
+    references = Post.objects.exclude(image='').order_by().values_list(
+        'image').annotate(total=Count('pk'))
+    ImageBlob.objects.bulk_create(
+        (ImageBlob(name=name, refcount=total) for name, total in references),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_post_image_meta'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=blog.storage.image_storage, upload_to='posts_images', verbose_name='Фото'),
+        ),
+        migrations.CreateModel(
+            name='ImageBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Файл')),
+                ('size', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Размер')),
+                ('refcount', models.PositiveIntegerField(default=0, help_text='Число постов, использующих файл.', verbose_name='Количество ссылок')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+                ('touched_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Последнее использование')),
+            ],
+            options={
+                'verbose_name': 'файл изображения',
+                'verbose_name_plural': 'Файлы изображений',
+                'indexes': [models.Index(condition=models.Q(('refcount', 0)), fields=['touched_at'], name='blob_unreferenced_idx')],
+            },
+        ),
+        migrations.RunPython(register_images, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,9 @@
 
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from .storage import image_storage
 
 
 # Получение модели пользователя.
@@ -73,7 +76,14 @@ class Post(models.Model):
     title = models.CharField("Заголовок", max_length=256)
     text = models.TextField("Текст")
     image = models.ImageField(
-        'Фото', upload_to='posts_images', blank=True
+        'Фото', upload_to='posts_images', storage=image_storage, blank=True
+    )
+    image_meta = models.JSONField(
+        'Сведения об изображении',
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text='Уменьшенные копии изображения и их размеры.'
     )
     pub_date = models.DateTimeField(
         "Дата и время публикации",
@@ -110,15 +120,46 @@ class Post(models.Model):
         "Добавлено",
         auto_now_add=True
     )
+    # Хранимое количество комментариев, обновляется сигналами.
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False
+    )
 
     class Meta:
         # Имена для использования в админ-зоне.
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        indexes = (
+            # Общая лента: только опубликованные посты по дате.
+            models.Index(
+                fields=('-pub_date',),
+                condition=models.Q(is_published=True),
+                name='post_published_pub_date_idx',
+            ),
+            # Страница профиля и страница категории.
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date'),
+                name='post_category_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Имя изображения на момент загрузки: по нему сигналы узнают,
+        # от какого файла пост отказался при сохранении.
+        instance.loaded_image = instance.__dict__.get('image')
+        return instance
+
 
 class Comment(models.Model):
     """Mодель, описывающая комментарий в блоге."""
@@ -143,6 +184,103 @@ class Comment(models.Model):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = (
+            # Комментарии на странице поста.
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_at_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text
+
+
+class OutgoingEmail(models.Model):
+    """Модель, описывающая письмо в очереди на отправку."""
+
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'В очереди'),
+        (SENDING, 'Отправляется'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не отправлено'),
+    )
+
+    subject = models.CharField('Тема', max_length=256)
+    body = models.TextField('Текст письма')
+    html_body = models.TextField('HTML-версия письма', blank=True)
+    from_email = models.CharField('Отправитель', max_length=254)
+    recipients = models.TextField(
+        'Получатели',
+        help_text='Адреса через запятую.'
+    )
+    status = models.CharField(
+        'Статус',
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток отправки', default=0)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка',
+        default=timezone.now
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField(
+        'Добавлено',
+        auto_now_add=True
+    )
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = (
+            # Выборка писем, готовых к отправке.
+            models.Index(
+                fields=('status', 'next_attempt_at'),
+                name='email_status_next_attempt_idx',
+            ),
+        )
+
+    def __str__(self):
+        return self.subject
+
+
+class ImageBlob(models.Model):
+    """Модель, описывающая файл изображения в хранилище по хешу."""
+
+    name = models.CharField('Файл', max_length=255, unique=True)
+    size = models.PositiveBigIntegerField('Размер', null=True, blank=True)
+    refcount = models.PositiveIntegerField(
+        'Количество ссылок',
+        default=0,
+        help_text='Число постов, использующих файл.'
+    )
+    created_at = models.DateTimeField(
+        'Добавлено',
+        auto_now_add=True
+    )
+    touched_at = models.DateTimeField(
+        'Последнее использование',
+        default=timezone.now
+    )
+
+    class Meta:
+        verbose_name = 'файл изображения'
+        verbose_name_plural = 'Файлы изображений'
+        indexes = (
+            # Выборка файлов без ссылок для удаления.
+            models.Index(
+                fields=('touched_at',),
+                condition=models.Q(refcount=0),
+                name='blob_unreferenced_idx',
+            ),
+        )
+
+    def __str__(self):
+        return self.name
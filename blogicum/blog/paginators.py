@@ -0,0 +1,185 @@
+"""Курсорная (keyset) пагинация для списков постов и комментариев."""
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import Http404
+
+
+class InvalidCursor(Exception):
+    """Курсор в параметрах запроса повреждён или подделан."""
+
+
+def encode_cursor(obj, field='pub_date'):
+    """Кодирование позиции объекта (field, id) в строку для URL."""
+    raw = f'{getattr(obj, field).isoformat()}|{obj.pk}'
+    return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Восстановление пары (дата, id) из строки курсора."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        pub_date, pk = urlsafe_b64decode(padded.encode()).decode().split('|')
+        return datetime.fromisoformat(pub_date), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor(cursor)
+
+
+class KeysetPage:
+    """
+    Страница курсорной пагинации.
+
+    Повторяет интерфейс django.core.paginator.Page в той части,
+    которую использует шаблон includes/paginator.html.
+    """
+
+    is_keyset = True
+    number = None
+
+    def __init__(self, object_list, paginator, has_next, has_previous,
+                 cursor_field='pub_date'):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.cursor_field = cursor_field
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        """Курсор для перехода к следующей странице."""
+        if self._has_next and self.object_list:
+            return encode_cursor(self.object_list[-1], self.cursor_field)
+        return None
+
+    @property
+    def previous_cursor(self):
+        """Курсор для перехода к предыдущей странице."""
+        if self._has_previous and self.object_list:
+            return encode_cursor(self.object_list[0], self.cursor_field)
+        return None
+
+
+class KeysetPaginator:
+    """
+    Пагинатор по ключу (pub_date, id) без COUNT(*) и OFFSET.
+
+    Каждая страница выбирается условием «строго старше/новее курсора»,
+    поэтому время выборки не зависит от глубины страницы.
+    """
+
+    # Номера страниц неизвестны: шаблон выводит только ссылки «вперёд/назад».
+    page_range = ()
+    num_pages = None
+
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+
+    def page(self, after=None, before=None):
+        """Страница постов старше курсора after или новее курсора before."""
+        queryset = self.object_list
+        if before:
+            pub_date, pk = decode_cursor(before)
+            rows = list(queryset.filter(
+                Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+            ).order_by('pub_date', 'pk')[:self.per_page + 1])
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            rows.reverse()
+            return KeysetPage(rows, self, True, has_previous)
+
+        if after:
+            pub_date, pk = decode_cursor(after)
+            queryset = queryset.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+            )
+        rows = list(
+            queryset.order_by('-pub_date', '-pk')[:self.per_page + 1]
+        )
+        has_next = len(rows) > self.per_page
+        return KeysetPage(rows[:self.per_page], self, has_next, bool(after))
+
+
+class CommentPaginator:
+    """
+    Пагинатор комментариев по ключу (created_at, id), от старых к новым.
+
+    Страницы идут только вперёд («Показать ещё»): первая выводится
+    вместе с постом, следующие подгружаются фрагментами по курсору.
+    """
+
+    page_range = ()
+    num_pages = None
+
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+
+    def page(self, after=None):
+        """Страница комментариев, оставленных после курсора after."""
+        queryset = self.object_list
+        if after:
+            created_at, pk = decode_cursor(after)
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at)
+                | Q(created_at=created_at, pk__gt=pk)
+            )
+        rows = list(
+            queryset.order_by('created_at', 'pk')[:self.per_page + 1]
+        )
+        has_next = len(rows) > self.per_page
+        return KeysetPage(rows[:self.per_page], self, has_next, bool(after),
+                          cursor_field='created_at')
+
+
+class KeysetPaginationMixin:
+    """
+    Миксин для ListView, включающий курсорную пагинацию.
+
+    Режим включается настройкой BLOG_KEYSET_PAGINATION или
+    атрибутом keyset_pagination у конкретного представления.
+    """
+
+    keyset_pagination = None
+
+    def use_keyset_pagination(self):
+        """Проверка, включена ли курсорная пагинация."""
+        if self.keyset_pagination is not None:
+            return self.keyset_pagination
+        return getattr(settings, 'BLOG_KEYSET_PAGINATION', False)
+
+    def paginate_queryset(self, queryset, page_size):
+        """Разбиение набора постов на страницы по курсору из запроса."""
+        if not self.use_keyset_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.page(after=self.request.GET.get('after'),
+                                  before=self.request.GET.get('before'))
+        except InvalidCursor:
+            raise Http404('Неверный курсор страницы')
+        return (paginator, page, page.object_list, page.has_other_pages())
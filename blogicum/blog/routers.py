@@ -0,0 +1,34 @@
+"""Маршрутизация запросов к базе между основной базой и репликами."""
+
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Разрешено ли читать из реплик в текущем запросе. Включается
+# ReplicaRoutingMiddleware только для представлений с use_replicas.
+replica_reads = ContextVar('replica_reads', default=False)
+
+
+class ReplicaRouter:
+    """
+    Чтение из реплик DATABASE_REPLICAS, запись — в основную базу.
+
+    Из реплик читают только представления, отмеченные use_replicas,
+    и только если посетитель не закреплён за основной базой после
+    собственной записи. Остальные запросы идут в основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        if replica_reads.get() and settings.DATABASE_REPLICAS:
+            return random.choice(settings.DATABASE_REPLICAS)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Явно: иначе объект, прочитанный из реплики, сохранялся бы в неё.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # В репликах те же данные, что и в основной базе.
+        return True
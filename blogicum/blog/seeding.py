@@ -0,0 +1,194 @@
+"""Генерация синтетических данных блога для нагрузочных замеров."""
+
+from datetime import timedelta
+from itertools import accumulate, islice
+from random import Random
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Category, Comment, Location, Post, User
+
+
+def batched(iterable, size):
+    """Разбиение итерируемого объекта на списки длиной не больше size."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def zipf_weights(count):
+    """Накопленные веса распределения Ципфа для random.choices."""
+    return list(accumulate(1 / rank for rank in range(1, count + 1)))
+
+
+class BlogSeeder:
+    """
+    Наполнение базы пользователями, категориями, местами, постами
+    и комментариями через bulk_create пачками по batch_size объектов.
+
+    Распределения приближены к реальным: активность авторов и
+    комментаторов подчиняется закону Ципфа, число комментариев
+    у поста — распределению Парето, часть постов отложена или снята
+    с публикации, часть категорий и мест скрыта. При одинаковом seed
+    генерируются одинаковые данные.
+
+    Посты создаются пачками вместе со своими комментариями, поэтому
+    в памяти одновременно находится не больше одной пачки постов.
+    """
+
+    # Показатель распределения Парето для числа комментариев у поста.
+    pareto_alpha = 1.5
+
+    def __init__(self, users=100, categories=10, locations=20, posts=1000,
+                 comments=5000, batch_size=1000, seed=0,
+                 future_ratio=0.02, unpublished_ratio=0.03,
+                 unpublished_category_ratio=0.1,
+                 unpublished_location_ratio=0.1):
+        self.users = users
+        self.categories = categories
+        self.locations = locations
+        self.posts = posts
+        self.comments = comments
+        self.batch_size = batch_size
+        self.future_ratio = future_ratio
+        self.unpublished_ratio = unpublished_ratio
+        self.unpublished_category_ratio = unpublished_category_ratio
+        self.unpublished_location_ratio = unpublished_location_ratio
+        self.random = Random(seed)
+        self.now = timezone.now()
+        self.comments_left = comments
+        self.posts_left = posts
+
+    def bulk_create(self, model, objects):
+        """Создание объектов пачками, возвращает список их pk."""
+        pks = []
+        for batch in batched(objects, self.batch_size):
+            with transaction.atomic():
+                pks.extend(
+                    obj.pk for obj in model.objects.bulk_create(batch)
+                )
+        return pks
+
+    def next_number(self, model):
+        """Номер, с которого начинаются имена новых объектов модели."""
+        return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+    def make_users(self):
+        start = self.next_number(User)
+        # Хэширование пароля дорогое, поэтому один хэш на всех.
+        password = make_password('seed-password')
+        return self.bulk_create(User, (
+            User(username=f'seed_user_{i}', email=f'seed_user_{i}@example.com',
+                 password=password, date_joined=self.now)
+            for i in range(start, start + self.users)
+        ))
+
+    def make_categories(self):
+        start = self.next_number(Category)
+        return self.bulk_create(Category, (
+            # Первая категория всегда опубликована, чтобы лента не пустовала.
+            Category(title=f'Категория {i}', slug=f'seed-category-{i}',
+                     description=f'Описание категории {i}',
+                     is_published=i == start or self.chance(
+                         1 - self.unpublished_category_ratio))
+            for i in range(start, start + self.categories)
+        ))
+
+    def make_locations(self):
+        start = self.next_number(Location)
+        return self.bulk_create(Location, (
+            Location(name=f'Место {i}',
+                     is_published=self.chance(
+                         1 - self.unpublished_location_ratio))
+            for i in range(start, start + self.locations)
+        ))
+
+    def chance(self, probability):
+        return self.random.random() < probability
+
+    def pub_date(self):
+        """Дата публикации: чаще в прошлом году, иногда отложенная."""
+        if self.chance(self.future_ratio):
+            return self.now + timedelta(
+                seconds=self.random.randrange(1, 30 * 86400)
+            )
+        return self.now - timedelta(seconds=self.random.randrange(365 * 86400))
+
+    def comments_per_post(self):
+        """
+        Количество комментариев у очередного поста.
+
+        Масштаб распределения Парето подбирается по оставшемуся объёму:
+        среднее равно comments_left / posts_left, дробная часть
+        округляется случайно, а последний пост получает остаток. Так
+        итоговое число комментариев в точности равно comments.
+        """
+        if not self.posts_left:
+            return 0
+        self.posts_left -= 1
+        if not self.posts_left:
+            count = self.comments_left
+        else:
+            mean = self.comments_left / (self.posts_left + 1)
+            scale = mean * (self.pareto_alpha - 1) / self.pareto_alpha
+            value = scale * self.random.paretovariate(self.pareto_alpha)
+            count = int(value) + self.chance(value % 1)
+            count = min(count, self.comments_left)
+        self.comments_left -= count
+        return count
+
+    def make_posts(self, numbers, user_pks, category_pks, location_pks):
+        authors = self.random.choices(user_pks, cum_weights=self.user_weights,
+                                      k=len(numbers))
+        return [
+            Post(
+                title=f'Пост {number}',
+                text=' '.join(['Текст синтетического поста.'] * 20),
+                pub_date=self.pub_date(),
+                is_published=self.chance(1 - self.unpublished_ratio),
+                author_id=author_pk,
+                category_id=self.random.choice(category_pks),
+                location_id=self.random.choice(location_pks),
+                comment_count=self.comments_per_post(),
+            )
+            for number, author_pk in zip(numbers, authors)
+        ]
+
+    def make_comments(self, posts, user_pks):
+        for post in posts:
+            authors = self.random.choices(
+                user_pks, cum_weights=self.user_weights, k=post.comment_count
+            )
+            for number, author_pk in enumerate(authors):
+                yield Comment(
+                    text=f'Комментарий {number} к посту {post.title}',
+                    post_id=post.pk,
+                    author_id=author_pk,
+                )
+
+    def run(self):
+        """Создание всех данных; возвращает количество созданных объектов."""
+        user_pks = self.make_users()
+        category_pks = self.make_categories()
+        location_pks = self.make_locations()
+        self.user_weights = zipf_weights(len(user_pks))
+        created_comments = 0
+        for numbers in batched(range(self.posts), self.batch_size):
+            with transaction.atomic():
+                posts = Post.objects.bulk_create(self.make_posts(
+                    numbers, user_pks, category_pks, location_pks
+                ))
+                comments = self.bulk_create(
+                    Comment, self.make_comments(posts, user_pks)
+                )
+            created_comments += len(comments)
+        return {
+            'users': len(user_pks),
+            'categories': len(category_pks),
+            'locations': len(location_pks),
+            'posts': self.posts,
+            'comments': created_comments,
+        }
@@ -0,0 +1,101 @@
+"""Обработчики сигналов моделей приложения blog."""
+
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cache import (bump_version, comments_version_name,
+                    invalidate_categories, invalidate_profile,
+                    invalidate_schedule, post_version_name)
+from .models import Category, Comment, Location, Post, User
+from .storage import acquire_blob, release_blob
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, **kwargs):
+    """Увеличение счётчика комментариев поста при создании комментария."""
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1
+        )
+        bump_version(post_version_name(instance.post_id), 'posts')
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    """Уменьшение счётчика комментариев поста при удалении комментария."""
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1
+    )
+    bump_version(post_version_name(instance.post_id), 'posts')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    """Сброс кэша карточки изменённого поста, списков и даты публикации."""
+    invalidate_schedule()
+    bump_version(post_version_name(instance.pk), 'posts')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comments(sender, instance, **kwargs):
+    """Сброс кэша списка комментариев поста."""
+    bump_version(comments_version_name(instance.post_id))
+
+
+@receiver(post_save, sender=Post)
+def count_image_references(sender, instance, **kwargs):
+    """Перенос ссылки поста со старого файла изображения на новый."""
+    if 'image' in instance.get_deferred_fields():
+        return
+    name = instance.image.name or ''
+    previous = getattr(instance, 'loaded_image', None) or ''
+    if name == previous:
+        return
+    if name:
+        acquire_blob(name)
+    if previous:
+        release_blob(previous)
+    instance.loaded_image = name
+
+
+@receiver(pre_delete, sender=Post)
+def load_image_before_delete(sender, instance, **kwargs):
+    """Загрузка имени изображения, пока строка поста ещё есть."""
+    if 'image' in instance.get_deferred_fields():
+        instance.refresh_from_db(fields=('image',))
+
+
+@receiver(post_delete, sender=Post)
+def release_image(sender, instance, **kwargs):
+    """Освобождение файла изображения удалённого поста."""
+    if instance.image.name:
+        release_blob(instance.image.name)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category(sender, instance, **kwargs):
+    """Сброс категорий, карточек и списков при изменении категории."""
+    invalidate_categories()
+    bump_version('categories', 'posts')
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_locations(sender, instance, **kwargs):
+    """Сброс карточек и списков при изменении любого местоположения."""
+    bump_version('locations', 'posts')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_users(sender, instance, update_fields=None, **kwargs):
+    """Сброс карточек, списков и профиля при изменении пользователя."""
+    # Вход на сайт обновляет только last_login, карточки от него не зависят.
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    invalidate_profile(instance.username)
+    bump_version('users', 'posts')
@@ -0,0 +1,38 @@
+"""Настройка соединений SQLite параметрами (PRAGMA) из настроек."""
+
+import re
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+PRAGMA_NAME = re.compile(r'^[a-z_]+$')
+
+
+def pragma_statements(pragmas):
+    """Команды PRAGMA для словаря {имя: значение}."""
+    statements = []
+    for name, value in pragmas.items():
+        if not PRAGMA_NAME.match(name):
+            raise ValueError(f'Недопустимое имя PRAGMA: {name!r}')
+        if not isinstance(value, int) and not PRAGMA_NAME.match(
+                str(value).lower()):
+            raise ValueError(f'Недопустимое значение PRAGMA {name}: '
+                             f'{value!r}')
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """
+    Выполнение SQLITE_PRAGMAS при открытии каждого соединения SQLite.
+
+    Режим журнала WAL сохраняется в файле базы, остальные параметры
+    действуют только в пределах соединения, поэтому задаются каждый раз.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(settings.SQLITE_PRAGMAS):
+            cursor.execute(statement)
@@ -0,0 +1,133 @@
+"""Хранилище изображений постов с именами по хешу содержимого."""
+
+import hashlib
+import re
+from pathlib import PurePosixPath
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db.models import F
+from django.utils import timezone
+
+# Заголовок для файлов, имя которых однозначно задаёт содержимое.
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+HASHED_NAME = re.compile(r'^[0-9a-f]{64}(\.\w+)?$')
+
+
+def is_hashed_name(name):
+    """Является ли имя файла хешем содержимого."""
+    return bool(HASHED_NAME.match(PurePosixPath(name).name))
+
+
+def blob_model():
+    # Модели импортируют хранилище, поэтому модель берётся из реестра.
+    return apps.get_model('blog', 'ImageBlob')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Файловое хранилище, сохраняющее файл под SHA-256 его содержимого.
+
+    Файл posts_images/photo.jpg сохраняется как
+    posts_images/ab/ab12…ef.jpg. Если такой файл уже есть, он не
+    записывается повторно: одинаковые фото разных постов хранятся
+    в одном экземпляре. Каждый файл учитывается в ImageBlob; ссылки
+    на него считают сигналы Post, а удаляет его команда gc_images.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Имя по хешу подбирается в _save; сюда FileSystemStorage
+        # возвращается, только если параллельная загрузка того же
+        # содержимого успела создать файл первой.
+        if is_hashed_name(name) and self.exists(name):
+            raise FileExistsError(name)
+        return name
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        path = PurePosixPath(name)
+        hexdigest = digest.hexdigest()
+        return str(path.parent / hexdigest[:2]
+                   / f'{hexdigest}{path.suffix.lower()}')
+
+    def _save(self, name, content):
+        name = self.hashed_name(name, content)
+        if self.exists(name) and touch_blob(name):
+            return name
+        # Запись учёта до файла: файл без записи gc_images не увидит.
+        blob, created = blob_model().objects.get_or_create(
+            name=name, defaults={'size': content.size}
+        )
+        if not created:
+            touch_blob(name)
+        try:
+            return super()._save(name, content)
+        except FileExistsError:
+            # Тот же файл только что записала другая загрузка.
+            return name
+
+
+_image_storage = ContentAddressedStorage()
+
+
+def image_storage():
+    """Хранилище для Post.image."""
+    return _image_storage
+
+
+def touch_blob(name):
+    """
+    Отметка о новом использовании файла.
+
+    Сдвигает срок, после которого gc_images может удалить файл без
+    ссылок, и возвращает False, если файл не учтён.
+    """
+    return bool(blob_model().objects.filter(name=name).update(
+        touched_at=timezone.now()
+    ))
+
+
+def acquire_blob(name):
+    """Увеличение счётчика ссылок на файл."""
+    Blob = blob_model()
+    updated = Blob.objects.filter(name=name).update(
+        refcount=F('refcount') + 1, touched_at=timezone.now()
+    )
+    if not updated:
+        # Файл загружен до появления учёта или задан именем.
+        blob, created = Blob.objects.get_or_create(
+            name=name, defaults={'refcount': 1}
+        )
+        if not created:
+            acquire_blob(name)
+
+
+def release_blob(name):
+    """Уменьшение счётчика ссылок на файл."""
+    blob_model().objects.filter(name=name, refcount__gt=0).update(
+        refcount=F('refcount') - 1, touched_at=timezone.now()
+    )
+
+
+def delete_blob_files(storage, name):
+    """
+    Удаление файла и его уменьшенных копий.
+
+    Копии лежат рядом с оригиналом под именами вида <имя>.<копия>.<расш>.
+    """
+    path = PurePosixPath(name)
+    directory = str(path.parent)
+    prefix = f'{path.stem}.'
+    try:
+        files = storage.listdir(directory)[1]
+    except FileNotFoundError:
+        files = []
+    for filename in files:
+        rest = filename[len(prefix):]
+        if filename.startswith(prefix) and rest.count('.') == 1:
+            storage.delete(str(PurePosixPath(directory) / filename))
+    storage.delete(name)
@@ -0,0 +1,218 @@
+"""Потоковые загрузка и выгрузка фикстур Django с ограниченной памятью."""
+
+import datetime
+import gzip
+import json
+from collections import defaultdict
+
+from django.core import serializers
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.serializers.python import Deserializer
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models.constants import OnConflict
+
+# Размер порции, читаемой из файла за раз.
+CHUNK_SIZE = 64 * 1024
+
+
+def open_fixture(path, mode='r'):
+    """Открытие фикстуры как текста; файлы .gz (рас)пакуются на лету."""
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def iter_json_objects(stream, chunk_size=CHUNK_SIZE):
+    """
+    Последовательный разбор объектов из JSON-массива или JSONL.
+
+    Файл читается порциями по chunk_size символов, в памяти держится
+    только ещё не разобранный хвост, а не весь документ.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+    while True:
+        # Пропуск пробелов и разделителей массива между объектами.
+        while position < len(buffer) and buffer[position] in ' \t\r\n[],':
+            position += 1
+        if position == len(buffer):
+            if eof:
+                return
+            buffer, position = stream.read(chunk_size), 0
+            eof = not buffer
+            continue
+        try:
+            obj, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        position = end
+        yield obj
+
+
+def dependency_order(models):
+    """Модели в порядке, при котором родители идут раньше ссылающихся."""
+    ordered = []
+    visiting = set()
+
+    def visit(model):
+        if model in ordered or model in visiting:
+            return
+        visiting.add(model)
+        for field in model._meta.concrete_fields:
+            if field.is_relation and field.related_model in models:
+                visit(field.related_model)
+        visiting.discard(model)
+        ordered.append(model)
+
+    for model in sorted(models, key=lambda model: model._meta.label):
+        visit(model)
+    return ordered
+
+
+class StreamingLoader:
+    """
+    Загрузка объектов фикстуры пачками через INSERT на несколько строк.
+
+    Объекты копятся в буферах по моделям; когда любой буфер заполняется,
+    сбрасываются все буферы в порядке зависимостей по внешним ключам,
+    каждый сброс — в отдельной транзакции. Вставка идёт в режиме raw,
+    как у loaddata: значения auto_now_add берутся из фикстуры.
+
+    Как и loaddata, существующие строки с тем же pk обновляются
+    (если база поддерживает INSERT ... ON CONFLICT DO UPDATE);
+    с ignore_conflicts=True такие объекты пропускаются.
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS, batch_size=1000,
+                 ignore_conflicts=False):
+        self.using = using
+        self.connection = connections[using]
+        self.batch_size = batch_size
+        features = self.connection.features
+        if ignore_conflicts:
+            self.on_conflict = OnConflict.IGNORE
+        elif features.supports_update_conflicts_with_target:
+            self.on_conflict = OnConflict.UPDATE
+        else:
+            self.on_conflict = None
+        self.buffers = defaultdict(list)
+        self.counts = defaultdict(int)
+
+    def load(self, stream):
+        """Загрузка фикстуры из текстового потока; возвращает счётчики."""
+        objects = Deserializer(iter_json_objects(stream), using=self.using,
+                               handle_forward_references=False)
+        with self.connection.constraint_checks_disabled():
+            for deserialized in objects:
+                model = type(deserialized.object)
+                self.buffers[model].append(deserialized)
+                if len(self.buffers[model]) >= self.batch_size:
+                    self.flush()
+            self.flush()
+        loaded = [model for model in self.counts]
+        self.connection.check_constraints(
+            table_names=[model._meta.db_table for model in loaded]
+        )
+        self.reset_sequences(loaded)
+        return {model._meta.label: count
+                for model, count in self.counts.items()}
+
+    def flush(self):
+        """Сброс всех буферов в базу в порядке зависимостей."""
+        with transaction.atomic(using=self.using):
+            for model in dependency_order(set(self.buffers)):
+                self.insert(model, self.buffers.pop(model))
+
+    def insert(self, model, deserialized_objects):
+        objs = [deserialized.object for deserialized in deserialized_objects]
+        opts = model._meta
+        fields = opts.local_concrete_fields
+        conflict_options = {'on_conflict': self.on_conflict}
+        if self.on_conflict == OnConflict.UPDATE:
+            conflict_options.update(
+                update_fields=[field for field in fields
+                               if not field.primary_key],
+                unique_fields=[opts.pk],
+            )
+        batch_size = max(
+            self.connection.ops.bulk_batch_size(fields, objs), 1
+        )
+        for start in range(0, len(objs), batch_size):
+            model._base_manager.using(self.using)._insert(
+                objs[start:start + batch_size],
+                fields=fields,
+                using=self.using,
+                raw=True,
+                **conflict_options,
+            )
+        for deserialized in deserialized_objects:
+            for name, values in (deserialized.m2m_data or {}).items():
+                if values:
+                    getattr(deserialized.object, name).set(values)
+        self.counts[model] += len(objs)
+
+    def reset_sequences(self, models):
+        """Синхронизация последовательностей pk после вставки с явными pk."""
+        statements = self.connection.ops.sequence_reset_sql(no_style(),
+                                                            models)
+        if statements:
+            with self.connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+
+class FixtureJSONEncoder(DjangoJSONEncoder):
+    """Кодировщик JSON, сохраняющий микросекунды в дате и времени."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def iter_chunks(queryset, chunk_size):
+    """
+    Обход набора пачками по первичному ключу.
+
+    Каждая пачка — отдельный короткий запрос, поэтому выгрузка не держит
+    курсор (и блокировку чтения) открытым на всё время работы.
+    """
+    last_pk = None
+    while True:
+        chunk_queryset = queryset.order_by('pk')
+        if last_pk is not None:
+            chunk_queryset = chunk_queryset.filter(pk__gt=last_pk)
+        chunk = list(chunk_queryset[:chunk_size].iterator(
+            chunk_size=chunk_size
+        ))
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1].pk
+
+
+def export_jsonl(stream, querysets, chunk_size=1000):
+    """
+    Запись объектов в формате фикстуры Django, по одному в строке (JSONL).
+
+    Результат читается командой stream_loaddata.
+    """
+    counts = {}
+    for queryset in querysets:
+        count = 0
+        for chunk in iter_chunks(queryset, chunk_size):
+            for obj in serializers.serialize('python', chunk):
+                stream.write(json.dumps(obj, cls=FixtureJSONEncoder,
+                                        ensure_ascii=False))
+                stream.write('\n')
+            count += len(chunk)
+        counts[queryset.model._meta.label] = count
+    return counts
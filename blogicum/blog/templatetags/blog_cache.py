@@ -0,0 +1,19 @@
+"""Шаблонные теги для кэширования фрагментов блога."""
+
+from django import template
+
+from blog import cache
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card_version(post):
+    """Версия кэша карточки поста для тега {% cache %}."""
+    return cache.post_card_version(post)
+
+
+@register.simple_tag
+def comment_list_version(post):
+    """Версия кэша списка комментариев поста для тега {% cache %}."""
+    return cache.comment_list_version(post)
@@ -0,0 +1,52 @@
+"""Шаблонные теги для вывода изображений постов."""
+
+from django import template
+from django.core.files.storage import default_storage
+
+register = template.Library()
+
+# Ширина колонки с карточкой поста (40rem) — подсказка браузеру,
+# какую копию из srcset выбрать.
+SIZES = '(max-width: 640px) 100vw, 640px'
+
+
+def srcset(variants, extension):
+    return ', '.join(
+        f'{default_storage.url(data["files"][extension])} {data["width"]}w'
+        for data in variants.values() if extension in data['files']
+    )
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, variant, eager=False):
+    """
+    Изображение поста с подходящей копией.
+
+    variant — копия по умолчанию для src (например, thumb в ленте,
+    medium на странице поста); в srcset перечисляются все копии,
+    а WebP-копии отдаются браузерам, которые его поддерживают.
+    Пока копии не готовы, выводится оригинал.
+
+    Ширина и высота берутся из Post.image_meta, а URL строятся
+    без обращения к файлам. Изображения, которые видны сразу
+    (eager=True), загружаются без отложенной загрузки.
+    """
+    meta = post.image_meta
+    variants = meta.get('variants') or {}
+    context = {
+        'loading': 'eager' if eager else 'lazy',
+        'width': meta.get('width'),
+        'height': meta.get('height'),
+    }
+    if variant not in variants:
+        return {**context, 'src': post.image.url}
+    data = variants[variant]
+    return {
+        **context,
+        'src': default_storage.url(data['files']['jpg']),
+        'width': data['width'],
+        'height': data['height'],
+        'srcset': srcset(variants, 'jpg'),
+        'webp_srcset': srcset(variants, 'webp'),
+        'sizes': SIZES,
+    }
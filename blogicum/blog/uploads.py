@@ -0,0 +1,285 @@
+"""Приём загружаемых изображений с ограничением размера и очисткой EXIF."""
+
+import shutil
+import struct
+import warnings
+from io import BytesIO
+
+from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import (
+    TemporaryUploadedFile, UploadedFile
+)
+from django.core.files.uploadhandler import FileUploadHandler
+from PIL import Image
+
+from .images import ORIENTATION
+
+# Размер порции при копировании файла.
+COPY_CHUNK_SIZE = 64 * 1024
+
+# Форматы изображений, которые принимаются при загрузке.
+ALLOWED_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+
+# Маркеры JPEG с метаданными: APP1 (EXIF, XMP), APP3–APP13, APP15
+# и комментарий. APP0 (JFIF), APP2 (цветовой профиль ICC) и APP14
+# (Adobe, цветовое пространство) нужны для правильного вывода цвета.
+JPEG_METADATA_MARKERS = {*range(0xE1, 0xF0), 0xFE} - {0xE2, 0xEE}
+
+# Чанки PNG с метаданными: EXIF, текстовые поля, время изменения.
+PNG_METADATA_CHUNKS = {b'eXIf', b'tEXt', b'zTXt', b'iTXt', b'tIME'}
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Чанки WebP с метаданными и соответствующие им флаги в чанке VP8X.
+WEBP_METADATA_CHUNKS = {b'EXIF': 0x08, b'XMP ': 0x04}
+
+
+class OversizedUpload(UploadedFile):
+    """Пустой файл на месте загрузки, превысившей UPLOAD_MAX_SIZE."""
+
+    def __init__(self, name, content_type, size):
+        super().__init__(BytesIO(), name, content_type, size)
+
+
+class SizeLimitedUploadHandler(FileUploadHandler):
+    """
+    Обработчик загрузки, отбрасывающий файлы больше UPLOAD_MAX_SIZE байт.
+
+    Ставится первым в FILE_UPLOAD_HANDLERS: пока файл укладывается
+    в ограничение, данные передаются следующему обработчику (он пишет
+    их во временный файл), а после превышения — отбрасываются. Вместо
+    такого файла форма получает OversizedUpload и сообщает об ошибке.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.UPLOAD_MAX_SIZE:
+            return None
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self.received > settings.UPLOAD_MAX_SIZE:
+            return OversizedUpload(self.file_name, self.content_type,
+                                   self.received)
+        return None
+
+
+def copy_bytes(source, target, size):
+    """Копирование size байт порциями."""
+    while size > 0:
+        chunk = source.read(min(size, COPY_CHUNK_SIZE))
+        if not chunk:
+            raise ValueError('Файл обрывается.')
+        target.write(chunk)
+        size -= len(chunk)
+
+
+def read_exact(source, size):
+    data = source.read(size)
+    if len(data) != size:
+        raise ValueError('Файл обрывается.')
+    return data
+
+
+def exif_orientation_segment(orientation):
+    """
+    Сегмент APP1 с EXIF, в котором есть только ориентация снимка.
+
+    Поворот пикселей потребовал бы полного декодирования, поэтому
+    ориентация переносится в новый EXIF, а остальные теги отбрасываются.
+    """
+    exif = (
+        b'Exif\x00\x00'
+        # Заголовок TIFF: порядок байт, число 42, смещение первого IFD.
+        b'MM\x00\x2a' + struct.pack('>I', 8)
+        # IFD из одной записи: тег, тип SHORT, количество, значение.
+        + struct.pack('>HHHIHH', 1, ORIENTATION, 3, 1, orientation, 0)
+        # Следующего IFD нет.
+        + struct.pack('>I', 0)
+    )
+    return b'\xff\xe1' + struct.pack('>H', len(exif) + 2) + exif
+
+
+def read_jpeg_marker(source):
+    """Чтение маркера JPEG с пропуском байтов-заполнителей 0xFF."""
+    if read_exact(source, 1) != b'\xff':
+        raise ValueError('Повреждённый заголовок JPEG.')
+    code = read_exact(source, 1)
+    while code == b'\xff':
+        code = read_exact(source, 1)
+    return b'\xff' + code
+
+
+def strip_jpeg_metadata(source, target, orientation=None):
+    """
+    Потоковое удаление метаданных (JPEG_METADATA_MARKERS) из JPEG.
+
+    Сегменты до начала сжатых данных (SOS) разбираются по заголовкам,
+    остаток файла копируется порциями без декодирования. Если задана
+    ориентация, она сохраняется в минимальном сегменте EXIF.
+    """
+    if read_exact(source, 2) != b'\xff\xd8':
+        raise ValueError('Нет маркера начала JPEG.')
+    target.write(b'\xff\xd8')
+    if orientation is not None:
+        target.write(exif_orientation_segment(orientation))
+    while True:
+        marker = read_jpeg_marker(source)
+        length_bytes = read_exact(source, 2)
+        length = struct.unpack('>H', length_bytes)[0]
+        if marker[1] in JPEG_METADATA_MARKERS:
+            source.seek(length - 2, 1)
+            continue
+        target.write(marker + length_bytes)
+        copy_bytes(source, target, length - 2)
+        if marker[1] == 0xDA:
+            shutil.copyfileobj(source, target, COPY_CHUNK_SIZE)
+            return
+
+
+def strip_png_metadata(source, target):
+    """Потоковое удаление чанков с метаданными из PNG."""
+    if read_exact(source, 8) != PNG_SIGNATURE:
+        raise ValueError('Нет сигнатуры PNG.')
+    target.write(PNG_SIGNATURE)
+    while True:
+        header = source.read(8)
+        if not header:
+            return
+        if len(header) != 8:
+            raise ValueError('Файл обрывается.')
+        length, chunk_type = struct.unpack('>I4s', header)
+        if chunk_type in PNG_METADATA_CHUNKS:
+            source.seek(length + 4, 1)
+            continue
+        target.write(header)
+        # Данные чанка и контрольная сумма.
+        copy_bytes(source, target, length + 4)
+        if chunk_type == b'IEND':
+            return
+
+
+def strip_webp_metadata(source, target):
+    """
+    Потоковое удаление чанков EXIF и XMP из WebP.
+
+    В чанке VP8X снимаются флаги удалённых чанков, а размер в заголовке
+    RIFF переписывается после копирования.
+    """
+    header = read_exact(source, 12)
+    if header[:4] != b'RIFF' or header[8:] != b'WEBP':
+        raise ValueError('Нет заголовка WebP.')
+    start = target.tell()
+    target.write(header)
+    while True:
+        chunk_header = source.read(8)
+        if not chunk_header:
+            break
+        if len(chunk_header) != 8:
+            raise ValueError('Файл обрывается.')
+        fourcc, length = struct.unpack('<4sI', chunk_header)
+        # Данные чанка выравниваются до чётной длины.
+        padded = length + length % 2
+        if fourcc in WEBP_METADATA_CHUNKS:
+            source.seek(padded, 1)
+            continue
+        target.write(chunk_header)
+        if fourcc == b'VP8X':
+            flags = read_exact(source, 1)[0]
+            for flag in WEBP_METADATA_CHUNKS.values():
+                flags &= ~flag
+            target.write(bytes([flags]))
+            padded -= 1
+        copy_bytes(source, target, padded)
+    end = target.tell()
+    target.seek(start + 4)
+    target.write(struct.pack('<I', end - start - 8))
+    target.seek(end)
+
+
+class SafeImageField(forms.ImageField):
+    """
+    Поле изображения, не декодирующее пиксели при проверке.
+
+    Проверяется только заголовок: формат из ALLOWED_FORMATS и число
+    пикселей не больше IMAGE_UPLOAD_MAX_PIXELS, что отсекает
+    «бомбы распаковки». Принятый файл копируется во временный файл
+    без метаданных EXIF: у JPEG остаётся только ориентация снимка.
+    В GIF контейнера EXIF нет, такие файлы копируются как есть.
+    """
+
+    default_error_messages = {
+        'too_large': 'Размер файла не должен превышать %(limit)s МБ.',
+        'too_many_pixels': (
+            'Изображение слишком большое: %(width)s×%(height)s пикселей.'
+        ),
+        'unsupported_format': 'Формат изображения не поддерживается.',
+    }
+
+    def to_python(self, data):
+        f = forms.FileField.to_python(self, data)
+        if f is None:
+            return None
+        if f.size > settings.UPLOAD_MAX_SIZE:
+            raise ValidationError(
+                self.error_messages['too_large'],
+                code='too_large',
+                params={'limit': settings.UPLOAD_MAX_SIZE // 2 ** 20},
+            )
+        f.seek(0)
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('error', Image.DecompressionBombWarning)
+                # Image.open читает только заголовок.
+                image = Image.open(f)
+        except Exception as exc:
+            raise ValidationError(
+                self.error_messages['invalid_image'],
+                code='invalid_image',
+            ) from exc
+        if image.format not in ALLOWED_FORMATS:
+            raise ValidationError(
+                self.error_messages['unsupported_format'],
+                code='unsupported_format',
+            )
+        width, height = image.size
+        if width * height > settings.IMAGE_UPLOAD_MAX_PIXELS:
+            raise ValidationError(
+                self.error_messages['too_many_pixels'],
+                code='too_many_pixels',
+                params={'width': width, 'height': height},
+            )
+        try:
+            cleaned = self.strip_metadata(f, image)
+        except Exception as exc:
+            raise ValidationError(
+                self.error_messages['invalid_image'],
+                code='invalid_image',
+            ) from exc
+        cleaned.image = image
+        return cleaned
+
+    def strip_metadata(self, f, image):
+        """Копия загруженного файла без метаданных."""
+        content_type = Image.MIME.get(image.format)
+        cleaned = TemporaryUploadedFile(f.name, content_type, 0, None)
+        f.seek(0)
+        if image.format == 'JPEG':
+            orientation = image.getexif().get(ORIENTATION)
+            if orientation == 1:
+                orientation = None
+            strip_jpeg_metadata(f, cleaned, orientation)
+        elif image.format == 'PNG':
+            strip_png_metadata(f, cleaned)
+        elif image.format == 'WEBP':
+            strip_webp_metadata(f, cleaned)
+        else:
+            shutil.copyfileobj(f, cleaned, COPY_CHUNK_SIZE)
+        cleaned.size = cleaned.tell()
+        cleaned.seek(0)
+        return cleaned
@@ -12,6 +12,9 @@ urlpatterns = [
          views.CategoryListView.as_view(),
          name='category_posts'),
 
+    path('posts/<int:post_id>/comments/',
+         views.CommentListView.as_view(),
+         name='post_comments'),
     path('posts/<int:post_id>/add_comment/',
          views.AddCommentView.as_view(),
          name='add_comment'),
@@ -41,5 +44,7 @@ urlpatterns = [
     path('profile/<str:username>/',
          views.ProfileView.as_view(), name='profile'),
 
+    path('metrics/', views.MetricsView.as_view(), name='metrics'),
+
     path('', views.PostListView.as_view(), name="index"),
 ]
@@ -1,24 +1,33 @@
 """CBV-представления для приложения blog."""
 
-from django.shortcuts import get_object_or_404, redirect
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.conf import settings
+from django.shortcuts import get_object_or_404, redirect, render
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.views import PasswordResetView
 from django.views.generic import (DetailView, ListView, CreateView,
-                                  DeleteView, UpdateView)
+                                  DeleteView, UpdateView, View)
 from django.utils import timezone
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
-from django.db.models import Count
-from django.http import Http404
+from django.utils.functional import SimpleLazyObject
+from django.http import Http404, JsonResponse
 from django.urls import reverse_lazy, reverse
-from django.core.mail import send_mail
 from random import choice
 from string import ascii_letters, punctuation, digits
 from django.template.loader import render_to_string
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.views.static import serve
 
-from .models import Category, Post, Comment, User
-from .forms import CommentForm, PostForm, UserForm, UserRegistrationForm
+from .models import Post, Comment, User
+from .cache import (AnonymousCacheMixin, get_profile_or_404,
+                    get_published_category_or_404, invalidate_profile)
+from .forms import (CommentForm, PostForm, QueuedPasswordResetForm, UserForm,
+                    UserRegistrationForm)
+from .mail import enqueue_mail
+from .metrics import email_metrics, registry
+from .paginators import (CommentPaginator, InvalidCursor,
+                         KeysetPaginationMixin, decode_cursor)
+from .storage import IMMUTABLE_CACHE_CONTROL, is_hashed_name
 
 
 # Количество постов на одной странице пагинатора.
@@ -34,88 +43,135 @@ class PostMixin:
             'category',
             'location',
             'author'
-        ).annotate(comment_count=Count('comments')).filter(
+        ).filter(
             category__is_published=True,
             is_published=True,
             pub_date__lte=timezone.now()
         ).order_by('-pub_date')
 
 
-class PostListView(PostMixin, ListView):
+class PostListView(AnonymousCacheMixin, KeysetPaginationMixin, PostMixin,
+                   ListView):
     """Главная страница блога."""
 
+    use_replicas = True
     model = Post
     template_name = 'blog/index.html'
     context_object_name = 'post_list'
     paginate_by = PAGES
+    cache_tags = ('posts',)
+    cache_until_next_publication = True
 
     def get_queryset(self):
         """Получение набора общедоступных постов."""
         return super().get_queryset().filter(category__is_published=True)
 
 
+def is_post_visible(post, user):
+    """Автору виден любой его пост, остальным — только опубликованные."""
+    if post.author_id == user.pk:
+        return True
+    return bool(post.category and post.category.is_published
+                and post.is_published
+                and post.pub_date <= timezone.now())
+
+
+def paginate_comments(post, after=None):
+    """
+    Страница комментариев поста после курсора after.
+
+    Страница загружается при первом обращении: если список отдан
+    из кэша шаблона, комментарии из базы не читаются.
+    """
+    if after:
+        try:
+            decode_cursor(after)
+        except InvalidCursor:
+            raise Http404('Неверный курсор страницы')
+    paginator = CommentPaginator(
+        Comment.objects.select_related('author').filter(post=post),
+        settings.COMMENTS_PER_PAGE
+    )
+    return SimpleLazyObject(lambda: paginator.page(after=after))
+
+
 class PostDetailView(DetailView):
     """Страница отдельного поста."""
 
+    use_replicas = True
     model = Post
     template_name = 'blog/detail.html'
     context_object_name = 'post'
     pk_url_kwarg = 'post_id'
 
-    def get_object(self):
-        """Получения поста с заданным post_id"""
-        post = super().get_object()
+    def get_queryset(self):
+        """Пост со связанными объектами одним запросом."""
+        return Post.objects.select_related(
+            'category',
+            'location',
+            'author'
+        )
+
+    def get_object(self, queryset=None):
+        """Получение поста с заданным post_id или ошибки 404."""
+        post = super().get_object(queryset)
+        if not is_post_visible(post, self.request.user):
+            raise Http404("Пост не найден")
         return post
 
     def get_context_data(self, **kwargs):
-        """Получение формы и комментариев к посту в контексте."""
+        """
+        Получение формы и первой страницы комментариев в контексте.
+
+        Остальные комментарии подгружает CommentListView, поэтому
+        страница поста не растёт вместе с числом комментариев.
+        """
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'
-                ] = Comment.objects.select_related('author'
-                                                   ).filter(post=self.object)
+        context['comments'] = paginate_comments(self.object)
         return context
 
-    def dispatch(self, request, *args, **kwargs):
-        """Обработка доступности поста, иначе возвращает ошибку."""
-        post = get_object_or_404(
-            Post,
-            pk=kwargs['post_id']
-        )
-        # Автор может просматривать все свои существующие посты.
-        if (request.user != post.author):
-            # Не автор может просматривать только уже опубликованные.
-            if not (post.category.is_published and post.is_published
-                    and post.pub_date <= timezone.now()):
-                raise Http404("Пост не найден")
 
-        return super().dispatch(request, *args, **kwargs)
+class CommentListView(View):
+    """Фрагмент HTML со следующей страницей комментариев поста."""
 
+    use_replicas = True
 
-class CategoryListView(PostMixin, ListView):
+    def get(self, request, post_id):
+        post = get_object_or_404(
+            Post.objects.select_related('category'), pk=post_id
+        )
+        if not is_post_visible(post, request.user):
+            raise Http404("Пост не найден")
+        after = request.GET.get('after', '')
+        return render(request, 'includes/comment_list.html', {
+            'post': post,
+            'comments': paginate_comments(post, after),
+            'comments_after': after,
+        })
+
+
+class CategoryListView(AnonymousCacheMixin, KeysetPaginationMixin,
+                       PostMixin, ListView):
     """Страница постов в данной категории."""
 
+    use_replicas = True
     model = Post
     template_name = 'blog/category.html'
     context_object_name = 'post_list'
     paginate_by = PAGES
     ordering = '-pub_date'
+    cache_tags = ('posts',)
+    cache_until_next_publication = True
 
-    def get_queryset(self):
-        """Получение постов в заданной категории или ошибки 404."""
-        category = get_object_or_404(Category,
-                                     slug=self.kwargs['category_slug'],
-                                     is_published=True)
-        return super().get_queryset().filter(category=category)
+    def setup(self, request, *args, **kwargs):
+        """Получение опубликованной категории или ошибки 404."""
+        super().setup(request, *args, **kwargs)
+        self.category = get_published_category_or_404(kwargs['category_slug'])
 
-    def dispatch(self, request, *args, **kwargs):
-        """Получение опубликованных постов в категории."""
-        query_set = Category.objects.filter(
-            slug=kwargs['category_slug'],
-            is_published=True
-        )
-        self.category = get_object_or_404(query_set)
-        return super().dispatch(request, *args, **kwargs)
+    def get_queryset(self):
+        """Получение постов в заданной категории."""
+        return super().get_queryset().filter(category=self.category)
 
     def get_context_data(self, **kwargs):
         """Передача категории в контекст страницы."""
@@ -146,40 +202,60 @@ class CreatePostView(LoginRequiredMixin, CreateView):
         return super().dispatch(request, *args, **kwargs)
 
 
-class EditPostView(UpdateView):
-    """Страница редактирования поста."""
+class PostOwnershipMixin:
+    """
+    Миксин для страниц, доступных только автору поста.
+
+    Пост загружается один раз с нужными полями и переиспользуется
+    в get_object, поэтому проверка прав не требует отдельного запроса.
+    """
 
     model = Post
-    form_class = PostForm
-    template_name = 'blog/create.html'
-    # Указываем, что используем 'post_id' как параметр для pk
     pk_url_kwarg = 'post_id'
+    # Поля поста, которые нужны странице помимо id и автора.
+    post_fields = ()
+
+    def get_post_fields(self):
+        return ('author', *self.post_fields)
+
+    def get_object(self, queryset=None):
+        """Получение поста с заданным post_id или ошибки 404."""
+        if not hasattr(self, '_post'):
+            self._post = get_object_or_404(
+                Post.objects.only(*self.get_post_fields()),
+                pk=self.kwargs[self.pk_url_kwarg]
+            )
+        return self._post
 
     def dispatch(self, request, *args, **kwargs):
         """Если пользователь не автор, перенаправляет на страницу поста."""
-        post = get_object_or_404(Post, pk=kwargs[self.pk_url_kwarg])
-        if post.author != request.user:
+        post = self.get_object()
+        if post.author_id != request.user.pk:
             return redirect(reverse_lazy('blog:post_detail', args=[post.id]))
         return super().dispatch(request, *args, **kwargs)
 
+
+class EditPostView(PostOwnershipMixin, UpdateView):
+    """Страница редактирования поста."""
+
+    form_class = PostForm
+    template_name = 'blog/create.html'
+
+    def get_post_fields(self):
+        """Поля поста, редактируемые в форме."""
+        return (*super().get_post_fields(), *self.form_class.base_fields)
+
     def get_success_url(self):
         """Перенаправление при успешном изменении."""
         return reverse_lazy('blog:post_detail', args=[self.object.id])
 
 
-class DeletePostView(DeleteView):
+class DeletePostView(PostOwnershipMixin, DeleteView):
     """Страница удаления поста."""
 
-    model = Post
     template_name = 'blog/create.html'
-    pk_url_kwarg = 'post_id'
-
-    def dispatch(self, request, *args, **kwargs):
-        """Если пользователь не автор, перенаправляет на страницу поста."""
-        post = get_object_or_404(Post, pk=kwargs[self.pk_url_kwarg])
-        if post.author != request.user:
-            return redirect(reverse_lazy('blog:post_detail', args=[post.id]))
-        return super().dispatch(request, *args, **kwargs)
+    # Имя изображения нужно сигналу, освобождающему файл.
+    post_fields = ('image',)
 
     def get_success_url(self):
         """Перенаправление на главную страницу при успешном удалении."""
@@ -268,36 +344,43 @@ class DeleteCommentView(DeleteView):
         return reverse_lazy('blog:post_detail', args=[self.object.post.id])
 
 
-class ProfileView(PostMixin, ListView):
+class ProfileView(AnonymousCacheMixin, KeysetPaginationMixin, PostMixin,
+                  ListView):
     """Страница профиля пользователя."""
 
     paginate_by = PAGES
+    use_replicas = True
     model = Post
     template_name = 'blog/profile.html'
     context_object_name = 'post_list'
+    cache_tags = ('posts', 'users')
+    cache_until_next_publication = True
+
+    def setup(self, request, *args, **kwargs):
+        """Получение профиля пользователя один раз на запрос."""
+        super().setup(request, *args, **kwargs)
+        self.profile = get_profile_or_404(kwargs['username'])
 
     def get_queryset(self):
         """
-        Получение профиля пользователя и заполнение его постами.
+        Заполнение профиля пользователя его постами.
         Автор видит все свои посты, гость видит только опубликованные.
         """
-        profile = get_object_or_404(User, username=self.kwargs['username'])
-        if self.request.user != profile:
-            return super().get_queryset().filter(author=profile,
+        if self.request.user != self.profile:
+            return super().get_queryset().filter(author=self.profile,
                                                  category__is_published=True)
         return Post.objects.select_related(
             'category',
             'location',
             'author'
-        ).annotate(comment_count=Count('comments')).filter(
-            author=profile
+        ).filter(
+            author=self.profile
         ).order_by('-pub_date')
 
     def get_context_data(self, **kwargs):
         """Передача профиля в контекст."""
         context = super().get_context_data(**kwargs)
-        context['profile'
-                ] = get_object_or_404(User, username=self.kwargs['username'])
+        context['profile'] = self.profile
         return context
 
 
@@ -312,6 +395,11 @@ class EditProfileView(LoginRequiredMixin, UpdateView):
         """Возвращает пользователя или ошибку 404."""
         return get_object_or_404(User, username=self.request.user.username)
 
+    def form_valid(self, form):
+        """Сброс кэша профиля под прежним именем пользователя."""
+        invalidate_profile(self.request.user.username)
+        return super().form_valid(form)
+
     def get_success_url(self):
         """Перенаправление после успешного редактирования."""
         return reverse_lazy('blog:profile', args=[self.request.user.username])
@@ -325,10 +413,10 @@ class RegistrationView(CreateView):
     success_url = reverse_lazy('blog:index')
 
     def form_valid(self, form):
-        """При успешной регистрации отправляет письмо пользователю."""
+        """При успешной регистрации ставит письмо пользователю в очередь."""
         response = super().form_valid(form)
 
-        send_mail(
+        enqueue_mail(
             'Добро пожаловать!',
             'Спасибо за регистрацию на нашем сайте.',
             'from@example.com',
@@ -341,6 +429,8 @@ class RegistrationView(CreateView):
 class PasswordResetEmailView(PasswordResetView):
     """Страница смены пароля."""
 
+    form_class = QueuedPasswordResetForm
+
     def generate_random_password(self, length=8):
         """Генерация случайного пароля."""
         characters = ascii_letters + digits + punctuation
@@ -370,13 +460,12 @@ class PasswordResetEmailView(PasswordResetView):
                 'registration/password_reset_email.html',
                 context)
 
-            # Отправка письма с ссылкой по данному адресу.
-            send_mail(
+            # Постановка письма с ссылкой по данному адресу в очередь.
+            enqueue_mail(
                 subject='Сброс пароля',
                 message=message,
                 from_email='admin@example.com',
                 recipient_list=[email],
-                fail_silently=False,
             )
             response = super().form_valid(form)
         else:
@@ -389,3 +478,29 @@ class PasswordResetEmailView(PasswordResetView):
             response = super().form_invalid()
 
         return response
+
+
+class MetricsView(UserPassesTestMixin, View):
+    """Сводка метрик запросов по представлениям для администраторов."""
+
+    def test_func(self):
+        """Доступ только для персонала."""
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        """Выдача скользящей гистограммы метрик в формате JSON."""
+        return JsonResponse({**registry.summary(),
+                             'email': email_metrics.summary()})
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """
+    Отдача медиафайлов в режиме DEBUG.
+
+    Имя изображения поста — хеш содержимого, поэтому такой файл
+    браузер может кэшировать без повторных проверок.
+    """
+    response = serve(request, path, document_root, show_indexes)
+    if is_hashed_name(path):
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
@@ -38,14 +38,73 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
+# Письма из представлений ставятся в очередь и отправляются командой
+# send_queued_mail; False — отправлять сразу в рамках запроса.
+EMAIL_QUEUE_ENABLED = True
+
+# Число попыток отправки письма из очереди.
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
+
+# Задержка перед повторной попыткой (сек), удваивается с каждой неудачей.
+EMAIL_QUEUE_RETRY_DELAY = 60
+
+# Предельная задержка перед повторной попыткой (сек).
+EMAIL_QUEUE_MAX_RETRY_DELAY = 60 * 60
+
+# Срок, на который обработчик захватывает письмо (сек).
+EMAIL_QUEUE_LEASE = 60 * 5
+
+# Настройки бэкенда blog.backends.BatchedEmailBackend: бэкенд, через
+# который уходят пачки, размер пачки и предельное ожидание письма (сек).
+# Буферизующий бэкенд рассчитан на отправку без очереди: обработчик
+# send_queued_mail обходит буфер и отправляет через EMAIL_BATCH_BACKEND.
+EMAIL_BATCH_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BATCH_SIZE = 50
+EMAIL_BATCH_MAX_DELAY = 2
+
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Загружаемые файлы сразу пишутся во временный файл, а всё, что сверх
+# UPLOAD_MAX_SIZE байт, отбрасывается.
+FILE_UPLOAD_HANDLERS = [
+    'blog.uploads.SizeLimitedUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+UPLOAD_MAX_SIZE = 10 * 2 ** 20
+
+# Наибольшее число пикселей в загружаемом изображении.
+IMAGE_UPLOAD_MAX_PIXELS = 40_000_000
+
+# Уменьшенные копии изображений постов: имя копии -> наибольшая ширина.
+IMAGE_VARIANTS = {'thumb': 640, 'medium': 1280}
+
+# Качество сжатия копий в JPEG и WebP.
+IMAGE_VARIANT_QUALITY = 80
+
+# Копии строятся в фоновом пуле из IMAGE_VARIANT_WORKERS потоков;
+# False — сразу при сохранении поста.
+IMAGE_VARIANTS_ASYNC = True
+IMAGE_VARIANT_WORKERS = 2
+
+# Изображения постов хранятся по хешу содержимого (blog.storage), поэтому
+# их URL неизменны и веб-сервер может отдавать их с заголовком
+# Cache-Control: public, max-age=31536000, immutable. Файл без ссылок
+# удаляет команда gc_images не раньше, чем через IMAGE_BLOB_GC_GRACE
+# секунд после последнего использования.
+IMAGE_BLOB_GC_GRACE = 24 * 60 * 60
+
 LOGIN_REDIRECT_URL = 'blog:index'
 
 LOGIN_URL = 'login'
 
 CSRF_FAILURE_VIEW = 'pages.views.handle403csrf'
 
+# Курсорная пагинация лент постов вместо постраничной (OFFSET + COUNT).
+BLOG_KEYSET_PAGINATION = False
+
+# Количество комментариев на странице поста и в каждой подгрузке.
+COMMENTS_PER_PAGE = 50
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -63,6 +122,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "debug_toolbar.middleware.DebugToolbarMiddleware",
+    'blog.middleware.RequestMetricsMiddleware',
+    'blog.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
 
@@ -106,6 +167,60 @@ DATABASES = {
     }
 }
 
+# Параметры, которые blog.sqlite задаёт каждому соединению SQLite.
+# WAL позволяет читать во время записи, synchronous=NORMAL в режиме WAL
+# не теряет целостность при сбое процесса, busy_timeout (мс) — сколько
+# ждать блокировку записи вместо ошибки «database is locked».
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    # Чтение файла через отображение в память, до 256 МБ.
+    'mmap_size': 256 * 2 ** 20,
+    # Отрицательное значение — размер кэша страниц в КиБ (64 МБ).
+    'cache_size': -64 * 2 ** 10,
+    'temp_store': 'MEMORY',
+}
+
+# Реплики только для чтения — все базы, кроме default (см. blog.routers).
+# Ленты, профили и страницы постов читают из них, запись идёт в default.
+# Для локальной проверки подойдут копии базы SQLite:
+#     DATABASES['replica1'] = {
+#         'ENGINE': 'django.db.backends.sqlite3',
+#         'NAME': BASE_DIR / 'db.replica1.sqlite3',
+#         'TEST': {'MIRROR': 'default'},
+#     }
+# Копии обновляются командой sync_replicas.
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+
+# После запроса на запись посетитель читает из default столько секунд.
+REPLICA_PIN_SECONDS = 5
+REPLICA_PIN_COOKIE = 'read_primary'
+
+
+# Версии групп кэша блога хранятся в кэше по умолчанию. Кэш в памяти
+# процесса годится только для одного процесса: при нескольких процессах
+# нужен общий кэш, иначе правки не сбрасывают кэш в соседних процессах
+# (см. проверку blog.W001 в manage.py check --deploy).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Время жизни страниц, закэшированных для анонимных посетителей (сек).
+PAGE_CACHE_TIMEOUT = 60 * 5
+
+# Время жизни кэша «имя пользователя → пользователь» (сек), 0 — отключить.
+PROFILE_CACHE_TIMEOUT = 60
+
+# Время жизни категорий в памяти процесса (сек).
+CATEGORY_CACHE_TIMEOUT = 60 * 10
+
+# Число последних запросов каждого представления в гистограмме метрик.
+METRICS_WINDOW = 1000
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -20,7 +20,8 @@ from django.conf.urls.static import static
 from django.urls import include, path
 
 
-from blog.views import RegistrationView, PasswordResetEmailView
+from blog.views import (PasswordResetEmailView, RegistrationView,
+                        serve_media)
 
 
 handler404 = 'pages.views.handle404'
@@ -53,5 +54,5 @@ urlpatterns = [
 if settings.DEBUG:
     import debug_toolbar
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
-    urlpatterns += static(settings.MEDIA_URL,
+    urlpatterns += static(settings.MEDIA_URL, view=serve_media,
                           document_root=settings.MEDIA_ROOT)
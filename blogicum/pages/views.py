@@ -3,6 +3,8 @@
 from django.shortcuts import render
 from django.views.generic import TemplateView
 
+from blog.cache import AnonymousCacheMixin
+
 
 def handle404(request, exception):
     return render(request, 'pages/404.html', status=404)
@@ -16,12 +18,14 @@ def handle500(request):
     return render(request, 'pages/500.html', status=500)
 
 
-class AboutView(TemplateView):
+class AboutView(AnonymousCacheMixin, TemplateView):
     template_name = 'pages/about.html'
+    cache_tags = ('pages',)
 
 
-class RulesView(TemplateView):
+class RulesView(AnonymousCacheMixin, TemplateView):
     template_name = 'pages/rules.html'
+    cache_tags = ('pages',)
 
 
 # class Custom404View(TemplateView):
@@ -0,0 +1,57 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def seeded_blog():
+    from blog.seeding import BlogSeeder
+    return BlogSeeder(users=5, categories=2, locations=2, posts=30,
+                      comments=60, batch_size=7).run()
+
+
+def test_seeder_counts(seeded_blog):
+    from blog.models import Comment, Post
+    assert Post.objects.count() == seeded_blog["posts"] == 30
+    assert Comment.objects.count() == seeded_blog["comments"] == 60, (
+        "Убедитесь, что создаётся ровно запрошенное число комментариев."
+    )
+    assert sum(
+        Post.objects.values_list("comment_count", flat=True)
+    ) == seeded_blog["comments"], (
+        "Убедитесь, что при генерации данных поле `comment_count` "
+        "соответствует числу созданных комментариев."
+    )
+
+
+def test_seeder_is_deterministic():
+    from blog.models import Post
+    from blog.seeding import BlogSeeder
+    for _ in range(2):
+        BlogSeeder(users=5, categories=3, locations=3, posts=50,
+                   comments=200, seed=7).run()
+    posts = list(Post.objects.order_by("pk").values_list(
+        "comment_count", "is_published"
+    ))
+    runs = [posts[:50], posts[50:]]
+    assert runs[0] == runs[1], (
+        "Убедитесь, что при одинаковом seed генерируются одинаковые данные."
+    )
+
+
+def test_benchmark_covers_blog_routes(seeded_blog):
+    from blog.benchmarks import BenchmarkRunner, compare
+    from blog.urls import urlpatterns
+    results = BenchmarkRunner(requests=2).run()
+    measured = {name.split(" ")[0] for name in results}
+    assert {f"blog:{path.name}" for path in urlpatterns} <= measured
+    for metrics in results.values():
+        assert metrics["p95_ms"] >= metrics["p50_ms"] > 0
+        assert metrics["warm_p95_ms"] >= metrics["warm_p50_ms"] > 0
+
+    assert compare(results, results, threshold=0) == []
+    baseline = {
+        name: dict(metrics, queries=metrics["queries"] - 1)
+        for name, metrics in results.items()
+    }
+    assert len(compare(results, baseline, threshold=0)) == len(results)
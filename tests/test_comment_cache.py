@@ -0,0 +1,65 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def commented_post(mixer, post_with_published_location, CommentModel, user):
+    mixer.cycle(3).blend(
+        CommentModel, post=post_with_published_location, author=user
+    )
+    return post_with_published_location
+
+
+def test_comment_list_served_from_cache(
+        client, commented_post, django_assert_num_queries
+):
+    url = f"/posts/{commented_post.id}/"
+    client.get(url)
+    # Из базы читается только пост, комментарии берутся из кэша.
+    with django_assert_num_queries(1):
+        response = client.get(url)
+    assert response.content.decode("utf-8").count("comment_") >= 3
+
+
+def test_comment_list_invalidated_by_comment_views(
+        user_client, commented_post, CommentModel
+):
+    post = commented_post
+    url = f"/posts/{post.id}/"
+    user_client.get(url)
+
+    user_client.post(f"/posts/{post.id}/add_comment/",
+                     data={"text": "Новый комментарий"})
+    assert "Новый комментарий" in user_client.get(url).content.decode(
+        "utf-8"
+    ), "Убедитесь, что кэш комментариев сбрасывается при добавлении."
+
+    comment = CommentModel.objects.get(text="Новый комментарий")
+    user_client.post(f"/posts/{post.id}/edit_comment/{comment.id}/",
+                     data={"text": "Исправленный комментарий"})
+    content = user_client.get(url).content.decode("utf-8")
+    assert "Исправленный комментарий" in content, (
+        "Убедитесь, что кэш комментариев сбрасывается при редактировании."
+    )
+
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    assert "Исправленный комментарий" not in user_client.get(
+        url
+    ).content.decode("utf-8"), (
+        "Убедитесь, что кэш комментариев сбрасывается при удалении."
+    )
+
+
+def test_comment_controls_overlay_per_user(
+        client, user_client, another_user_client, commented_post, user
+):
+    url = f"/posts/{commented_post.id}/"
+    rule = f'[data-comment-author="{user.pk}"] .comment-controls'
+    # Общий кэш заполняет анонимный посетитель.
+    assert rule not in client.get(url).content.decode("utf-8")
+    assert rule in user_client.get(url).content.decode("utf-8"), (
+        "Убедитесь, что автору комментария показываются кнопки "
+        "редактирования и удаления."
+    )
+    assert rule not in another_user_client.get(url).content.decode("utf-8")
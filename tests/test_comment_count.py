@@ -0,0 +1,47 @@
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+        mixer, post_with_published_location, CommentModel
+):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend(CommentModel, post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что при создании комментария увеличивается поле "
+        "`comment_count` поста."
+    )
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что при удалении комментария уменьшается поле "
+        "`comment_count` поста."
+    )
+
+
+def test_recount_comments_repairs_drift(
+        mixer, post_with_published_location, CommentModel
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend(CommentModel, post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=42)
+    call_command("recount_comments", batch_size=1)
+    post.refresh_from_db()
+    assert post.comment_count == 2
+
+
+def test_recount_comments_resets_card_cache(
+        mixer, client, post_with_published_location, CommentModel
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend(CommentModel, post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=42)
+    assert "Комментарии (42)" in client.get("/").content.decode("utf-8")
+    call_command("recount_comments")
+    assert "Комментарии (2)" in client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что после пересчёта комментариев сбрасывается кэш "
+        "карточек и страниц."
+    )
@@ -0,0 +1,111 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import Image
+
+from blog.models import ImageBlob, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(tmp_path, settings):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def _upload(color=(73, 109, 137)):
+    buffer = BytesIO()
+    Image.new("RGB", (40, 20), color=color).save(buffer, format="JPEG")
+    return SimpleUploadedFile("photo.jpg", buffer.getvalue(),
+                              content_type="image/jpeg")
+
+
+def _create(client, category, location, title, image):
+    response = client.post("/posts/create/", data={
+        "title": title,
+        "text": "Текст",
+        "pub_date": timezone.now().strftime("%Y-%m-%dT%H:%M"),
+        "category": category.id,
+        "location": location.id,
+        "is_published": True,
+        "image": image,
+    })
+    assert response.status_code == 302
+    return Post.objects.get(title=title)
+
+
+def test_same_image_stored_once(
+        user_client, another_user_client, published_category,
+        published_location, tmp_path
+):
+    first = _create(user_client, published_category, published_location,
+                    "Первый", _upload())
+    second = _create(another_user_client, published_category,
+                     published_location, "Второй", _upload())
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые изображения сохраняются в один файл."
+    )
+    assert first.image.name.startswith("posts_images/")
+    assert len([path for path in tmp_path.rglob("*") if path.is_file()]) == 1
+    assert ImageBlob.objects.get(name=first.image.name).refcount == 2, (
+        "Убедитесь, что у файла считаются ссылки из постов."
+    )
+
+
+def test_gc_keeps_shared_and_removes_unreferenced(
+        user_client, another_user_client, published_category,
+        published_location
+):
+    first = _create(user_client, published_category, published_location,
+                    "Первый", _upload())
+    second = _create(another_user_client, published_category,
+                     published_location, "Второй", _upload())
+    own = _create(user_client, published_category, published_location,
+                  "Третий", _upload(color=(200, 10, 10)))
+    storage = first.image.storage
+
+    user_client.post(f"/posts/{first.id}/delete/")
+    user_client.post(f"/posts/{own.id}/delete/")
+    assert ImageBlob.objects.get(name=second.image.name).refcount == 1
+    assert ImageBlob.objects.get(name=own.image.name).refcount == 0
+
+    call_command("gc_images")
+    assert storage.exists(own.image.name), (
+        "Убедитесь, что `gc_images` не удаляет файлы до истечения "
+        "IMAGE_BLOB_GC_GRACE."
+    )
+    call_command("gc_images", grace=0, batch_size=1)
+    assert storage.exists(second.image.name), (
+        "Убедитесь, что `gc_images` не удаляет файлы, на которые "
+        "ссылаются посты."
+    )
+    assert not storage.exists(own.image.name), (
+        "Убедитесь, что `gc_images` удаляет файлы без ссылок."
+    )
+    assert not ImageBlob.objects.filter(name=own.image.name).exists()
+
+
+def test_gc_repairs_drifted_refcount(
+        user_client, published_category, published_location
+):
+    post = _create(user_client, published_category, published_location,
+                   "Пост", _upload())
+    ImageBlob.objects.update(refcount=0)
+    call_command("gc_images", grace=0)
+    assert post.image.storage.exists(post.image.name)
+    assert ImageBlob.objects.get(name=post.image.name).refcount == 1
+
+
+def test_hashed_media_served_immutable(
+        user_client, published_category, published_location, settings, rf
+):
+    post = _create(user_client, published_category, published_location,
+                   "Пост", _upload())
+    from blog.views import serve_media
+
+    response = serve_media(rf.get("/media/"), post.image.name,
+                           document_root=settings.MEDIA_ROOT)
+    assert "immutable" in response["Cache-Control"]
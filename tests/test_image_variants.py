@@ -0,0 +1,168 @@
+from io import BytesIO
+from unittest import mock
+
+import pytest
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from PIL import Image
+
+from blog.images import webp_supported
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(tmp_path, settings):
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_VARIANTS = {"thumb": 200, "medium": 400}
+    settings.IMAGE_VARIANTS_ASYNC = False
+
+
+def _upload(width=1000, height=500):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), color=(73, 109, 137)).save(
+        buffer, format="JPEG"
+    )
+    return SimpleUploadedFile("photo.jpg", buffer.getvalue(),
+                              content_type="image/jpeg")
+
+
+def test_upload_builds_variants(
+        user_client, published_category, published_location,
+        django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        response = user_client.post("/posts/create/", data={
+            "title": "Пост с фото",
+            "text": "Текст",
+            "pub_date": timezone.now().strftime("%Y-%m-%dT%H:%M"),
+            "category": published_category.id,
+            "location": published_location.id,
+            "is_published": True,
+            "image": _upload(),
+        })
+    assert response.status_code == 302
+    post = Post.objects.get(title="Пост с фото")
+    assert (post.image_meta["width"], post.image_meta["height"]) == (
+        1000, 500
+    ), "Убедитесь, что размеры изображения сохраняются при загрузке."
+    variants = post.image_meta.get("variants")
+    assert variants, (
+        "Убедитесь, что при загрузке изображения создаются его копии."
+    )
+    assert (variants["thumb"]["width"], variants["thumb"]["height"]) == (
+        200, 100
+    )
+    assert variants["medium"]["width"] == 400
+    for data in variants.values():
+        assert default_storage.exists(data["files"]["jpg"])
+        if webp_supported():
+            assert default_storage.exists(data["files"]["webp"])
+
+    content = user_client.get("/").content.decode("utf-8")
+    thumb_url = default_storage.url(variants["thumb"]["files"]["jpg"])
+    assert f'src="{thumb_url}"' in content, (
+        "Убедитесь, что в ленте выводится уменьшенная копия изображения."
+    )
+    assert "srcset=" in content
+    if webp_supported():
+        assert 'type="image/webp"' in content
+
+
+def test_original_shown_until_variants_ready(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    assert not post.image_meta
+    content = user_client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    assert f'src="{post.image.url}"' in content
+
+
+@override_settings(IMAGE_VARIANTS={"thumb": 50})
+def test_build_image_variants_command(post_with_published_location):
+    call_command("build_image_variants")
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    assert post.image_meta["variants"]["thumb"]["width"] == 50
+
+
+def test_feed_rendering_does_not_touch_files(
+        user_client, mixer, user, published_category
+):
+    mixer.cycle(3).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now(),
+        image="posts_images/missing.jpg",
+        image_meta={"width": 800, "height": 600},
+    )
+    failing = mock.Mock(side_effect=AssertionError(
+        "Убедитесь, что при выводе ленты не читаются файлы изображений."
+    ))
+    with mock.patch.object(FileSystemStorage, "open", failing), \
+            mock.patch.object(FileSystemStorage, "exists", failing), \
+            mock.patch.object(FileSystemStorage, "size", failing), \
+            mock.patch("PIL.Image.open", failing):
+        response = user_client.get("/")
+    assert response.status_code == 200
+    content = response.content.decode("utf-8")
+    assert content.count('width="800" height="600"') == 3, (
+        "Убедитесь, что у изображений в ленте указаны ширина и высота."
+    )
+    assert content.count('decoding="async"') == 3
+    assert content.count('loading="eager"') == 1, (
+        "Убедитесь, что первое изображение ленты загружается сразу."
+    )
+    assert content.count('loading="lazy"') == 2, (
+        "Убедитесь, что остальные изображения ленты загружаются отложенно."
+    )
+
+
+def test_replaced_image_variants_collected(
+        user_client, published_category, published_location,
+        django_capture_on_commit_callbacks
+):
+    data = {
+        "title": "Пост с фото",
+        "text": "Текст",
+        "pub_date": timezone.now().strftime("%Y-%m-%dT%H:%M"),
+        "category": published_category.id,
+        "location": published_location.id,
+        "is_published": True,
+    }
+    with django_capture_on_commit_callbacks(execute=True):
+        user_client.post("/posts/create/", data={**data, "image": _upload()})
+    post = Post.objects.get()
+    old_files = [
+        name for variant in post.image_meta["variants"].values()
+        for name in variant["files"].values()
+    ]
+    with django_capture_on_commit_callbacks(execute=True):
+        response = user_client.post(f"/posts/{post.id}/edit/", data={
+            **data, "image": _upload(600, 300)
+        })
+    assert response.status_code == 302
+    call_command("gc_images", grace=0)
+    assert not any(default_storage.exists(name) for name in old_files), (
+        "Убедитесь, что копии заменённого изображения удаляются вместе "
+        "с ним командой `gc_images`."
+    )
+    post.refresh_from_db()
+    assert post.image_meta["variants"]["thumb"]["width"] == 200
+
+
+def test_background_errors_are_logged(caplog):
+    from blog import images
+
+    with mock.patch.object(images, "generate_variants",
+                           side_effect=OSError("битый файл")), \
+            mock.patch.object(images.connections, "close_all"):
+        images._run_in_background(42)
+    assert "42" in caplog.text and "битый файл" in caplog.text, (
+        "Убедитесь, что ошибки фонового создания копий пишутся в журнал."
+    )
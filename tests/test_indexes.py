@@ -0,0 +1,72 @@
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _query_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def _assert_no_full_scan(queryset, table, page):
+    if connection.vendor != "sqlite":
+        pytest.skip("Проверка плана запроса рассчитана на SQLite.")
+    plan = _query_plan(queryset)
+    full_scans = [
+        step for step in plan
+        if step.startswith(f"SCAN {table}") and "INDEX" not in step
+    ]
+    assert not full_scans, (
+        f"Убедитесь, что запрос {page} использует индекс таблицы "
+        f"`{table}`, а не полный просмотр. План запроса: {plan}"
+    )
+
+
+def _view(view_cls, user, **kwargs):
+    request = RequestFactory().get("/")
+    request.user = user
+    view = view_cls()
+    view.setup(request, **kwargs)
+    return view
+
+
+def test_feed_uses_index(user):
+    from blog.views import PostListView
+    _assert_no_full_scan(
+        _view(PostListView, user).get_queryset(),
+        "blog_post", "главной страницы",
+    )
+
+
+def test_category_uses_index(user, published_category):
+    from blog.views import CategoryListView
+    view = _view(
+        CategoryListView, user, category_slug=published_category.slug
+    )
+    view.category = published_category
+    _assert_no_full_scan(
+        view.get_queryset(), "blog_post", "страницы категории"
+    )
+
+
+def test_profile_uses_index(user, another_user):
+    from blog.views import ProfileView
+    for viewer in (user, another_user):
+        _assert_no_full_scan(
+            _view(ProfileView, viewer, username=user.username).get_queryset(),
+            "blog_post", "страницы профиля",
+        )
+
+
+def test_post_comments_use_index(post_with_published_location):
+    from blog.models import Comment
+    _assert_no_full_scan(
+        Comment.objects.select_related("author").filter(
+            post=post_with_published_location
+        ),
+        "blog_comment", "комментариев к посту",
+    )
@@ -0,0 +1,99 @@
+import pytest
+from django.core import mail
+from django.core.mail import send_mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import override_settings
+
+from blog.backends import batcher
+from blog.metrics import email_metrics
+
+
+class CountingBackend(EmailBackend):
+    """Бэкенд в память, считающий открытые соединения."""
+
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+
+@pytest.fixture(autouse=True)
+def reset_batcher():
+    batcher.flush(fail_silently=True)
+    email_metrics.clear()
+    CountingBackend.opened = 0
+    yield
+    batcher.flush(fail_silently=True)
+
+
+def _send(count):
+    for number in range(count):
+        send_mail(f"Письмо {number}", "Текст", "from@example.com",
+                  [f"user{number}@example.com"])
+
+
+@override_settings(
+    EMAIL_BACKEND="blog.backends.BatchedEmailBackend",
+    EMAIL_BATCH_BACKEND="test_mail_batching.CountingBackend",
+    EMAIL_BATCH_SIZE=3,
+    EMAIL_BATCH_MAX_DELAY=60,
+)
+def test_messages_flushed_in_batches():
+    _send(2)
+    assert not mail.outbox, (
+        "Убедитесь, что письма копятся в буфере до заполнения пачки."
+    )
+    assert email_metrics.summary()["depth"] == 2
+
+    _send(4)
+    assert len(mail.outbox) == 6
+    assert CountingBackend.opened == 2, (
+        "Убедитесь, что каждая пачка писем отправляется через одно "
+        "соединение."
+    )
+    stats = email_metrics.summary()
+    assert stats["depth"] == 0
+    assert stats["max_depth"] == 3
+    assert stats["sent"] == 6
+    assert stats["batches"] == 2
+
+
+@override_settings(
+    EMAIL_BACKEND="blog.backends.BatchedEmailBackend",
+    EMAIL_BATCH_BACKEND="test_mail_batching.CountingBackend",
+    EMAIL_BATCH_SIZE=100,
+    EMAIL_BATCH_MAX_DELAY=0.01,
+)
+def test_partial_batch_flushed_by_timer():
+    _send(1)
+    timer = batcher._timer
+    assert timer is not None
+    timer.join(timeout=5)
+    assert len(mail.outbox) == 1, (
+        "Убедитесь, что неполная пачка отправляется по истечении "
+        "EMAIL_BATCH_MAX_DELAY."
+    )
+
+
+@override_settings(
+    EMAIL_BACKEND="blog.backends.BatchedEmailBackend",
+    EMAIL_BATCH_BACKEND="test_mail_queue.FailingBackend",
+    EMAIL_BATCH_SIZE=100,
+    EMAIL_BATCH_MAX_DELAY=60,
+)
+@pytest.mark.django_db
+def test_queue_worker_bypasses_buffer():
+    from django.core.management import call_command
+
+    from blog.mail import enqueue_mail
+    from blog.models import OutgoingEmail
+
+    enqueue_mail("Тема", "Текст", "from@example.com", ["to@example.com"])
+    call_command("send_queued_mail")
+    email = OutgoingEmail.objects.get()
+    assert email.status == OutgoingEmail.PENDING and email.attempts == 1, (
+        "Убедитесь, что письмо из очереди не считается отправленным, пока "
+        "оно лишь попало в буфер."
+    )
+    assert email_metrics.summary()["depth"] == 0
@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.mail import enqueue_mail
+from blog.models import OutgoingEmail
+
+pytestmark = [pytest.mark.django_db]
+
+
+class FailingBackend(BaseEmailBackend):
+    """Почтовый бэкенд, не отправляющий ни одного письма."""
+
+    def send_messages(self, messages):
+        raise ConnectionError("SMTP недоступен")
+
+
+def test_registration_enqueues_email(client):
+    response = client.post("/auth/registration/", data={
+        "username": "new_user",
+        "email": "new_user@example.com",
+        "password1": "Sup3r-secret-pass",
+        "password2": "Sup3r-secret-pass",
+    })
+    assert response.status_code == 302
+    assert not mail.outbox, (
+        "Убедитесь, что представление регистрации не отправляет письмо "
+        "в рамках запроса."
+    )
+    email = OutgoingEmail.objects.get()
+    assert email.recipients == "new_user@example.com"
+    assert email.status == OutgoingEmail.PENDING
+
+    call_command("send_queued_mail")
+    assert [message.to for message in mail.outbox] == [
+        ["new_user@example.com"]
+    ], "Убедитесь, что команда send_queued_mail отправляет письма из очереди."
+    email.refresh_from_db()
+    assert email.status == OutgoingEmail.SENT
+    assert email.sent_at is not None
+
+
+@override_settings(EMAIL_BACKEND="test_mail_queue.FailingBackend",
+                   EMAIL_QUEUE_RETRY_DELAY=60)
+def test_failed_email_is_retried_with_backoff():
+    email = enqueue_mail("Тема", "Текст", "from@example.com",
+                         ["to@example.com"])
+
+    call_command("send_queued_mail", max_attempts=3)
+    email.refresh_from_db()
+    assert email.status == OutgoingEmail.PENDING
+    assert email.attempts == 1
+    assert "SMTP недоступен" in email.last_error
+    assert email.next_attempt_at > timezone.now() + timedelta(seconds=50), (
+        "Убедитесь, что неудачная попытка откладывает следующую."
+    )
+
+    # Письмо не готово к отправке до наступления next_attempt_at.
+    call_command("send_queued_mail", max_attempts=3)
+    email.refresh_from_db()
+    assert email.attempts == 1
+
+    for expected_attempts in (2, 3):
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        call_command("send_queued_mail", max_attempts=3)
+        email.refresh_from_db()
+        assert email.attempts == expected_attempts
+    assert email.status == OutgoingEmail.FAILED, (
+        "Убедитесь, что после исчерпания попыток письмо помечается "
+        "неотправленным."
+    )
+
+
+@override_settings(EMAIL_QUEUE_ENABLED=False)
+def test_queue_disabled_sends_immediately():
+    assert enqueue_mail("Тема", "Текст", "from@example.com",
+                        ["to@example.com"]) is None
+    assert len(mail.outbox) == 1
+    assert not OutgoingEmail.objects.exists()
@@ -0,0 +1,38 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def staff_client(mixer, client):
+    from django.contrib.auth import get_user_model
+    client.force_login(mixer.blend(get_user_model(), is_staff=True))
+    return client
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    from blog.metrics import registry
+    registry.clear()
+
+
+def test_server_timing_header(user_client, post_with_published_location):
+    response = user_client.get(f"/posts/{post_with_published_location.id}/")
+    timing = response["Server-Timing"]
+    for metric in ("db;dur=", "tpl;dur=", "total;dur="):
+        assert metric in timing, (
+            "Убедитесь, что ответ содержит метрики в заголовке Server-Timing."
+        )
+
+
+def test_metrics_endpoint_staff_only(
+        staff_client, user_client, post_with_published_location
+):
+    assert user_client.get("/metrics/").status_code == 403
+    user_client.get(f"/posts/{post_with_published_location.id}/")
+    response = staff_client.get("/metrics/")
+    assert response.status_code == 200
+    stats = response.json()["blog:post_detail"]
+    assert stats["requests"] == 1
+    assert stats["sql_count"]["max"] >= 2
+    assert stats["template"]["max"] > 0
@@ -0,0 +1,109 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_feed_cached_for_anonymous(client, post_with_published_location):
+    client.get("/")
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get("/")
+    assert response.status_code == 200
+    assert post_with_published_location.title in response.content.decode(
+        "utf-8"
+    )
+    assert not ctx.captured_queries, (
+        "Убедитесь, что главная страница для анонимных посетителей "
+        "отдаётся из кэша без запросов к базе данных."
+    )
+
+
+def test_feed_not_cached_for_users(user_client, post_with_published_location):
+    user_client.get("/")
+    with CaptureQueriesContext(connection) as ctx:
+        user_client.get("/")
+    assert ctx.captured_queries, (
+        "Убедитесь, что страницы авторизованных пользователей не кэшируются."
+    )
+
+
+def test_feed_purged_on_post_change(client, post_with_published_location):
+    client.get("/")
+    post_with_published_location.title = "Новый заголовок поста"
+    post_with_published_location.save()
+    assert "Новый заголовок поста" in client.get("/").content.decode("utf-8")
+
+
+def test_feed_cache_expires_at_next_publication(
+        client, mixer, user, published_category
+):
+    from blog.cache import AnonymousCacheMixin
+    from blog.views import PostListView
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    view = PostListView()
+    assert isinstance(view, AnonymousCacheMixin)
+    assert view.get_page_cache_timeout() <= 31, (
+        "Убедитесь, что страница ленты кэшируется не дольше, чем до "
+        "ближайшей отложенной публикации."
+    )
+
+
+def test_next_publication_not_recomputed_per_store(
+        client, mixer, user, published_category, post_with_published_location
+):
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    client.get("/")
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(f"/category/{published_category.slug}/")
+    assert not any("MIN(" in query["sql"].upper()
+                   for query in ctx.captured_queries), (
+        "Убедитесь, что дата ближайшей публикации берётся из кэша, "
+        "а не вычисляется при сохранении каждой страницы."
+    )
+
+
+def test_cached_pages_invalidated_at_publication_boundary(
+        client, mixer, user, published_category
+):
+    now = timezone.now()
+    scheduled = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=now + timedelta(hours=1),
+    )
+    urls = ["/", f"/category/{published_category.slug}/",
+            f"/profile/{user.username}/"]
+    for url in urls:
+        assert scheduled.title not in client.get(url).content.decode("utf-8")
+    # Срок жизни страниц в кэше не истёк, но дата публикации наступила.
+    with mock.patch("django.utils.timezone.now",
+                    return_value=now + timedelta(hours=2)):
+        for url in urls:
+            assert scheduled.title in client.get(url).content.decode(
+                "utf-8"
+            ), (
+                f"Убедитесь, что страница `{url}` из кэша сбрасывается "
+                "в момент отложенной публикации."
+            )
+
+
+def test_profile_cached_for_anonymous(client, post_with_published_location):
+    url = f"/profile/{post_with_published_location.author.username}/"
+    client.get(url)
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    assert not ctx.captured_queries, (
+        "Убедитесь, что страница профиля для анонимных посетителей "
+        "отдаётся из кэша."
+    )
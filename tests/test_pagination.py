@@ -0,0 +1,186 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def keyset_posts(mixer, user, published_category):
+    now = timezone.now()
+    # Половина постов с одинаковой датой: порядок задаётся по id.
+    pub_dates = (
+        now - timedelta(hours=i // 2) for i in range(N_PER_PAGE * 2 + 5)
+    )
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=pub_dates,
+    )
+
+
+def _walk(user_client, url, param, cursor_attr):
+    seen = []
+    query = ""
+    while True:
+        response = user_client.get(url + query)
+        assert response.status_code == 200
+        page = response.context["page_obj"]
+        assert getattr(page, "is_keyset", False), (
+            "Убедитесь, что при включённой настройке "
+            "`BLOG_KEYSET_PAGINATION` используется курсорная пагинация."
+        )
+        seen.append([post.id for post in page])
+        cursor = getattr(page, cursor_attr)
+        if not cursor:
+            return seen
+        query = f"?{param}={cursor}"
+
+
+@override_settings(BLOG_KEYSET_PAGINATION=True)
+def test_keyset_pagination_walks_feed(user_client, keyset_posts):
+    expected = [
+        post.id for post in sorted(
+            keyset_posts, key=lambda p: (p.pub_date, p.id), reverse=True
+        )
+    ]
+    pages = _walk(user_client, "/", "after", "next_cursor")
+    assert [len(ids) for ids in pages] == [N_PER_PAGE, N_PER_PAGE, 5]
+    assert sum(pages, []) == expected, (
+        "Убедитесь, что курсорная пагинация выводит посты по убыванию "
+        "(pub_date, id) без пропусков и повторов."
+    )
+
+    first_page = user_client.get("/").context["page_obj"]
+    second_page = user_client.get(
+        f"/?after={first_page.next_cursor}"
+    ).context["page_obj"]
+    newer = user_client.get(
+        f"/?before={second_page.previous_cursor}"
+    ).context["page_obj"]
+    assert [post.id for post in newer] == expected[:N_PER_PAGE]
+    assert not newer.has_previous()
+
+
+@override_settings(BLOG_KEYSET_PAGINATION=True)
+def test_keyset_pagination_skips_count(user_client, keyset_posts):
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.get("/")
+    assert response.status_code == 200
+    assert not any(
+        "COUNT(*)" in query["sql"] for query in ctx.captured_queries
+    ), "Убедитесь, что курсорная пагинация не выполняет запрос COUNT(*)."
+    content = response.content.decode("utf-8")
+    assert "?after=" in content
+
+
+@override_settings(BLOG_KEYSET_PAGINATION=True)
+def test_keyset_pagination_invalid_cursor(user_client, keyset_posts):
+    assert user_client.get("/?after=broken!").status_code == 404
+
+
+def _walk_anonymous(client, url):
+    """Обход курсоров по ссылкам в HTML: из кэша страница без контекста."""
+    pages = []
+    query = ""
+    while True:
+        response = client.get(url + query)
+        assert response.status_code == 200
+        content = response.content.decode("utf-8")
+        ids = re.findall(r'href="/posts/(\d+)/"', content)
+        pages.append([int(pk) for pk in dict.fromkeys(ids)])
+        cursor = re.search(r'href="\?after=([^"]+)"', content)
+        if cursor is None:
+            return pages
+        query = f"?after={cursor.group(1)}"
+
+
+@override_settings(BLOG_KEYSET_PAGINATION=True)
+def test_keyset_pagination_anonymous_cached(client, keyset_posts):
+    expected = [
+        post.id for post in sorted(
+            keyset_posts, key=lambda p: (p.pub_date, p.id), reverse=True
+        )
+    ]
+    pages = _walk_anonymous(client, "/")
+    assert sum(pages, []) == expected, (
+        "Убедитесь, что курсорная пагинация работает для анонимных "
+        "посетителей."
+    )
+    # Повторный обход отдаётся из кэша: у каждого курсора своя страница.
+    with CaptureQueriesContext(connection) as ctx:
+        cached_pages = _walk_anonymous(client, "/")
+    assert cached_pages == pages, (
+        "Убедитесь, что курсор входит в ключ кэша страницы."
+    )
+    assert not any(
+        "blog_post" in query["sql"] for query in ctx.captured_queries
+    ), "Убедитесь, что страницы с курсором берутся из кэша."
+
+
+@pytest.fixture
+def many_comments(mixer, post_with_published_location, CommentModel):
+    comments = mixer.cycle(7).blend(
+        CommentModel, post=post_with_published_location
+    )
+    # Часть комментариев с одинаковым временем: порядок задаётся по id.
+    same_time = timezone.now() - timedelta(hours=1)
+    CommentModel.objects.filter(
+        pk__in=[comment.pk for comment in comments[:4]]
+    ).update(created_at=same_time)
+    return comments
+
+
+@override_settings(COMMENTS_PER_PAGE=3)
+def test_comments_paginated_with_load_more(
+        client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    content = client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    seen = [int(pk) for pk in re.findall(r'name="comment_(\d+)"', content)]
+    assert len(seen) == 3, (
+        "Убедитесь, что на странице поста выводится только первая "
+        "страница комментариев (`COMMENTS_PER_PAGE`)."
+    )
+    while True:
+        match = re.search(r'href="([^"]+)" data-load-more', content)
+        if not match:
+            break
+        response = client.get(match.group(1).replace("&amp;", "&"))
+        assert response.status_code == 200
+        content = response.content.decode("utf-8")
+        seen += [
+            int(pk) for pk in re.findall(r'name="comment_(\d+)"', content)
+        ]
+    expected = sorted(
+        many_comments, key=lambda comment: (
+            type(comment).objects.get(pk=comment.pk).created_at, comment.pk
+        )
+    )
+    assert seen == [comment.pk for comment in expected], (
+        "Убедитесь, что ссылка «Показать ещё» подгружает все "
+        "комментарии по порядку, без пропусков и повторов."
+    )
+
+
+def test_comments_fragment_checks_post_and_cursor(
+        client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    assert client.get(
+        f"/posts/{post.id}/comments/?after=неверный"
+    ).status_code == 404
+    type(post).objects.filter(pk=post.pk).update(is_published=False)
+    assert client.get(f"/posts/{post.id}/comments/").status_code == 404, (
+        "Убедитесь, что комментарии скрытого поста недоступны "
+        "через подгрузку."
+    )
@@ -0,0 +1,39 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_card_invalidated_on_changes(
+        client, mixer, post_with_published_location, CommentModel
+):
+    post = post_with_published_location
+    assert post.title in client.get("/").content.decode("utf-8")
+
+    post.title = "Обновлённый заголовок"
+    post.save()
+    assert "Обновлённый заголовок" in client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что кэш карточки поста сбрасывается при изменении поста."
+    )
+
+    post.category.title = "Новая категория"
+    post.category.save()
+    assert "Новая категория" in client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что кэш карточки поста сбрасывается при изменении "
+        "категории."
+    )
+
+    mixer.blend(CommentModel, post=post)
+    assert "Комментарии (1)" in client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что кэш карточки поста сбрасывается при добавлении "
+        "комментария."
+    )
+
+
+def test_post_card_served_from_cache(client, post_with_published_location):
+    client.get("/")
+    type(post_with_published_location).objects.filter(
+        pk=post_with_published_location.pk
+    ).update(title="Изменено в обход сигналов")
+    assert "Изменено в обход сигналов" not in client.get("/").content.decode(
+        "utf-8"
+    ), "Убедитесь, что карточки постов кэшируются."
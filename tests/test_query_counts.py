@@ -0,0 +1,115 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def commented_post(mixer, post_with_published_location, CommentModel):
+    mixer.cycle(5).blend(CommentModel, post=post_with_published_location)
+    return post_with_published_location
+
+
+def test_post_detail_query_count(
+        client, commented_post, django_assert_num_queries
+):
+    # Пост со связанными объектами и комментарии с авторами.
+    with django_assert_num_queries(2):
+        response = client.get(f"/posts/{commented_post.id}/")
+    assert response.status_code == 200
+    assert len(response.context["comments"]) == 5
+
+
+def test_post_detail_query_count_for_author(
+        user_client, commented_post, django_assert_num_queries
+):
+    # Дополнительно сессия и пользователь запроса.
+    with django_assert_num_queries(4):
+        response = user_client.get(f"/posts/{commented_post.id}/")
+    assert response.status_code == 200
+
+
+# Сессия, пользователь запроса и единственный запрос поста; форма
+# редактирования дополнительно загружает варианты категорий и мест.
+@pytest.mark.parametrize(("action", "n_queries"), [("edit", 5), ("delete", 3)])
+def test_post_owner_pages_query_count(
+        user_client, post_with_published_location, django_assert_num_queries,
+        action, n_queries
+):
+    with django_assert_num_queries(n_queries):
+        response = user_client.get(
+            f"/posts/{post_with_published_location.id}/{action}/"
+        )
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("action", ["edit", "delete"])
+def test_post_owner_pages_redirect_not_author(
+        another_user_client, post_with_published_location,
+        django_assert_num_queries, action
+):
+    with django_assert_num_queries(3):
+        response = another_user_client.get(
+            f"/posts/{post_with_published_location.id}/{action}/"
+        )
+    assert response.status_code == 302
+
+
+def test_profile_resolves_user_once(
+        client, many_posts_with_published_locations, django_assert_num_queries
+):
+    url = f"/profile/{many_posts_with_published_locations[0].author.username}/"
+    # Пользователь, дата ближайшей публикации (для кэша страницы),
+    # количество постов и страница постов.
+    with django_assert_num_queries(4):
+        assert client.get(url).status_code == 200
+    # Другой страницы нет в кэше страниц, а пользователь и дата
+    # публикации берутся из кэша.
+    with django_assert_num_queries(2):
+        assert client.get(url + "?page=1").status_code == 200
+
+
+def test_profile_cache_invalidated_on_edit(user_client, user):
+    old_username = user.username
+    assert user_client.get(f"/profile/{old_username}/").status_code == 200
+    response = user_client.post("/profile/edit/", {
+        "username": "renamed_user",
+        "first_name": "Новое",
+        "last_name": "Имя",
+        "email": "renamed@example.com",
+    })
+    assert response.status_code == 302
+    assert user_client.get(f"/profile/{old_username}/").status_code == 404
+    response = user_client.get("/profile/renamed_user/")
+    assert response.context["profile"].first_name == "Новое"
+
+
+def test_category_resolved_once_and_cached(
+        user_client, many_posts_with_published_locations, published_category,
+        django_assert_num_queries
+):
+    url = f"/category/{published_category.slug}/"
+    # Сессия, пользователь, категория, количество постов и страница постов.
+    with django_assert_num_queries(5):
+        assert user_client.get(url).status_code == 200
+    # Повторно категория берётся из памяти процесса.
+    with django_assert_num_queries(4):
+        assert user_client.get(url).status_code == 200
+
+    published_category.is_published = False
+    published_category.save()
+    assert user_client.get(url).status_code == 404, (
+        "Убедитесь, что кэш категорий сбрасывается при изменении категории."
+    )
+
+
+def test_profile_cache_excludes_password(client, user):
+    from django.core.cache import cache
+
+    from blog.cache import profile_cache_key
+
+    assert client.get(f"/profile/{user.username}/").status_code == 200
+    cached = cache.get(profile_cache_key(user.username))
+    assert cached is not None
+    assert "password" in cached.get_deferred_fields(), (
+        "Убедитесь, что хэш пароля не попадает в кэш профиля."
+    )
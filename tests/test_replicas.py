@@ -0,0 +1,82 @@
+import pytest
+from django.core.management import call_command
+from django.db import connections
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+REPLICA = "replica_test"
+
+
+@pytest.fixture
+def replica(tmp_path, settings):
+    # Отдельный файл SQLite в роли реплики.
+    connections.settings[REPLICA] = connections.configure_settings({
+        "default": connections.settings["default"],
+        REPLICA: {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": str(tmp_path / "replica.sqlite3"),
+        }
+    })[REPLICA]
+    settings.DATABASE_REPLICAS = [REPLICA]
+    yield REPLICA
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.settings[REPLICA]
+
+
+def _stale_replica(post):
+    call_command("sync_replicas")
+    Post.objects.using(REPLICA).filter(pk=post.pk).update(
+        title="Заголовок из реплики"
+    )
+
+
+def test_read_views_use_replica(client, replica, post_with_published_location):
+    post = post_with_published_location
+    _stale_replica(post)
+    for url in ("/", f"/category/{post.category.slug}/",
+                f"/profile/{post.author.username}/", f"/posts/{post.id}/"):
+        assert "Заголовок из реплики" in client.get(url).content.decode(
+            "utf-8"
+        ), f"Убедитесь, что страница `{url}` читает данные из реплики."
+
+
+def test_writes_go_to_primary_and_pin_reads(
+        user_client, replica, post_with_published_location
+):
+    post = post_with_published_location
+    _stale_replica(post)
+    url = f"/posts/{post.id}/"
+    assert "Заголовок из реплики" in user_client.get(url).content.decode(
+        "utf-8"
+    )
+    response = user_client.post(f"/posts/{post.id}/add_comment/",
+                                data={"text": "Свежий комментарий"})
+    assert response.status_code == 302
+    assert Comment.objects.using("default").filter(
+        text="Свежий комментарий"
+    ).exists(), "Убедитесь, что запись идёт в основную базу."
+    assert not Comment.objects.using(REPLICA).exists()
+    content = user_client.get(url).content.decode("utf-8")
+    assert "Свежий комментарий" in content, (
+        "Убедитесь, что после записи посетитель читает из основной базы."
+    )
+    assert post.title in content
+
+    del user_client.cookies["read_primary"]
+    assert "Заголовок из реплики" in user_client.get(url).content.decode(
+        "utf-8"
+    ), "Убедитесь, что закрепление за основной базой временное."
+
+
+def test_write_views_read_primary(user_client, replica,
+                                  post_with_published_location):
+    post = post_with_published_location
+    _stale_replica(post)
+    content = user_client.get(f"/posts/{post.id}/edit/").content.decode(
+        "utf-8"
+    )
+    assert post.title in content
+    assert "Заголовок из реплики" not in content
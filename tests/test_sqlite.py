@@ -0,0 +1,122 @@
+import threading
+import time
+
+import pytest
+from django.db import connections, transaction
+
+from blog.models import Comment
+from blog.sqlite import pragma_statements
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+STRESS = "sqlite_stress"
+
+
+@pytest.fixture
+def file_db(tmp_path):
+    # Тестовая база SQLite хранится в памяти, а WAL работает с файлом.
+    connections.settings[STRESS] = connections.configure_settings({
+        "default": connections.settings["default"],
+        STRESS: {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": str(tmp_path / "stress.sqlite3"),
+        },
+    })[STRESS]
+    connections["default"].ensure_connection()
+    connections[STRESS].ensure_connection()
+    connections["default"].connection.backup(connections[STRESS].connection)
+    yield STRESS
+    connections[STRESS].close()
+    del connections[STRESS]
+    del connections.settings[STRESS]
+
+
+def _pragma(alias, name):
+    with connections[alias].cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+def test_pragmas_applied(file_db, settings):
+    assert _pragma(file_db, "journal_mode") == "wal", (
+        "Убедитесь, что для базы SQLite включается режим журнала WAL."
+    )
+    assert _pragma(file_db, "busy_timeout") == (
+        settings.SQLITE_PRAGMAS["busy_timeout"]
+    )
+    assert _pragma(file_db, "synchronous") == 1  # NORMAL
+    assert _pragma(file_db, "temp_store") == 2  # MEMORY
+
+
+def test_invalid_pragma_rejected():
+    with pytest.raises(ValueError):
+        pragma_statements({"journal_mode": "WAL; DROP TABLE blog_post"})
+
+
+def test_readers_proceed_during_comment_writes(
+        post_with_published_location, user, file_db
+):
+    post, errors, reads, finished = post_with_published_location, [], [], {}
+    report_open, writes_done = threading.Event(), threading.Event()
+
+    def report():
+        # Долгое чтение в транзакции, например выгрузка или отчёт.
+        try:
+            with transaction.atomic(using=file_db):
+                list(Comment.objects.using(file_db).filter(post=post))
+                report_open.set()
+                time.sleep(1)
+            finished["report"] = time.monotonic()
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connections.close_all()
+
+    def writer(n_comments):
+        report_open.wait(5)
+        try:
+            for i in range(n_comments):
+                Comment.objects.using(file_db).create(
+                    text=f"Комментарий {i}", post=post, author=user
+                )
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connections.close_all()
+
+    def reader():
+        report_open.wait(5)
+        try:
+            while not writes_done.is_set():
+                start = time.monotonic()
+                list(Comment.objects.using(file_db).filter(post=post)[:20])
+                reads.append(time.monotonic() - start)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=report)]
+    writers = [threading.Thread(target=writer, args=(20,)) for _ in range(3)]
+    readers = [threading.Thread(target=reader) for _ in range(3)]
+    for thread in threads + writers + readers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    finished["writes"] = time.monotonic()
+    writes_done.set()
+    for thread in threads + readers:
+        thread.join()
+
+    assert not errors, (
+        "Убедитесь, что параллельные запись и чтение не приводят "
+        f"к ошибкам «database is locked»: {errors}"
+    )
+    assert Comment.objects.using(file_db).count() == 60
+    assert finished["writes"] < finished["report"], (
+        "Убедитесь, что запись комментариев не ждёт окончания долгих "
+        "читающих транзакций (режим WAL)."
+    )
+    assert reads and max(reads) < 0.5, (
+        "Убедитесь, что чтение не блокируется на время записи комментариев."
+    )
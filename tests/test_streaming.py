@@ -0,0 +1,89 @@
+import gzip
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+FIXTURE = [
+    {"model": "auth.user", "pk": 50, "fields": {
+        "username": "stream_author", "password": "!",
+        "date_joined": "2022-01-01T00:00:00Z"}},
+    {"model": "blog.comment", "pk": 7, "fields": {
+        "text": "Комментарий", "post": 3, "author": 50,
+        "created_at": "2022-01-03T00:00:00Z"}},
+    {"model": "blog.post", "pk": 3, "fields": {
+        "title": "Пост", "text": "Текст", "pub_date": "2022-01-02T00:00:00Z",
+        "author": 50, "category": 4, "location": None,
+        "is_published": True, "created_at": "2022-01-02T00:00:00Z"}},
+    {"model": "blog.category", "pk": 4, "fields": {
+        "title": "Категория", "description": "Описание", "slug": "stream",
+        "is_published": True, "created_at": "2022-01-01T00:00:00Z"}},
+]
+
+
+def test_iter_json_objects_small_chunks():
+    from blog.streaming import iter_json_objects
+    array = json.dumps(FIXTURE, ensure_ascii=False, indent=2)
+    jsonl = "\n".join(json.dumps(obj) for obj in FIXTURE)
+    for text in (array, jsonl):
+        assert list(iter_json_objects(io.StringIO(text), chunk_size=5)) == (
+            FIXTURE
+        )
+
+
+@pytest.mark.parametrize("fmt", ["json", "jsonl.gz"])
+def test_stream_loaddata(tmp_path, fmt):
+    from blog.models import Comment, Post
+    path = tmp_path / f"fixture.{fmt}"
+    if fmt == "json":
+        path.write_text(json.dumps(FIXTURE), encoding="utf-8")
+    else:
+        with gzip.open(path, "wt", encoding="utf-8") as file:
+            file.writelines(json.dumps(obj) + "\n" for obj in FIXTURE)
+
+    # Комментарий в файле идёт раньше поста и категории, на которые ссылается.
+    call_command("stream_loaddata", str(path), batch_size=1,
+                 stdout=io.StringIO())
+    post = Post.objects.get(pk=3)
+    assert post.created_at.year == 2022, (
+        "Убедитесь, что потоковая загрузка сохраняет значения "
+        "`auto_now_add` из фикстуры."
+    )
+    assert post.comment_count == 1
+    assert Comment.objects.get(pk=7).post_id == 3
+
+    # Повторная загрузка обновляет существующие строки.
+    call_command("stream_loaddata", str(path), stdout=io.StringIO())
+    assert Post.objects.count() == 1
+
+
+def test_export_blog_roundtrip(
+        tmp_path, mixer, post_with_published_location, CommentModel
+):
+    from blog.models import Category, Comment, Location, Post
+    mixer.cycle(3).blend(CommentModel, post=post_with_published_location)
+    path = tmp_path / "blog.jsonl.gz"
+    call_command("export_blog", output=str(path), chunk_size=2,
+                 stderr=io.StringIO())
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        labels = [json.loads(line)["model"] for line in file]
+    assert labels.count("blog.comment") == 3
+
+    expected = list(Comment.objects.values_list("pk", "text", "created_at"))
+    for model in (Comment, Post, Category, Location):
+        model.objects.all().delete()
+    call_command("stream_loaddata", str(path), stdout=io.StringIO())
+    assert list(
+        Comment.objects.values_list("pk", "text", "created_at")
+    ) == expected
+    assert Post.objects.get().comment_count == 3
+
+
+def test_export_blog_since(tmp_path, post_with_published_location):
+    path = tmp_path / "blog.jsonl"
+    call_command("export_blog", output=str(path), since="2999-01-01",
+                 stderr=io.StringIO())
+    assert path.read_text(encoding="utf-8") == ""
@@ -0,0 +1,178 @@
+import struct
+import zlib
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from PIL import Image, features
+
+from blog.forms import PostForm
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+ORIENTATION = 0x0112
+MAKE = 0x010F
+
+
+@pytest.fixture(autouse=True)
+def media_root(tmp_path, settings):
+    settings.MEDIA_ROOT = tmp_path
+
+
+@pytest.fixture
+def form_data(published_category, published_location):
+    return {
+        "title": "Пост с фото",
+        "text": "Текст",
+        "pub_date": timezone.now().strftime("%Y-%m-%dT%H:%M"),
+        "category": published_category.id,
+        "location": published_location.id,
+        "is_published": True,
+    }
+
+
+def _jpeg(size=(40, 20), orientation=1):
+    exif = Image.Exif()
+    exif[MAKE] = "Секретная камера"
+    exif[ORIENTATION] = orientation
+    buffer = BytesIO()
+    Image.new("RGB", size, color=(73, 109, 137)).save(
+        buffer, format="JPEG", exif=exif
+    )
+    return buffer.getvalue()
+
+
+def _png_chunk(chunk_type, data):
+    return (struct.pack(">I", len(data)) + chunk_type + data
+            + struct.pack(">I", zlib.crc32(chunk_type + data)))
+
+
+def _png_header(width, height):
+    return b"\x89PNG\r\n\x1a\n" + _png_chunk(
+        b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    )
+
+
+def _png(width, height, text=b""):
+    rows = b"".join(b"\x00" + b"\x00\x00\x00" * width for _ in range(height))
+    return (
+        _png_header(width, height)
+        + (_png_chunk(b"tEXt", text) if text else b"")
+        + _png_chunk(b"IDAT", zlib.compress(rows))
+        + _png_chunk(b"IEND", b"")
+    )
+
+
+def _save(form_data, user, content, name="photo.jpg"):
+    form = PostForm(data=form_data, files={
+        "image": SimpleUploadedFile(name, content)
+    })
+    if not form.is_valid():
+        return form, None
+    form.instance.author = user
+    return form, form.save()
+
+
+def test_jpeg_exif_is_stripped(form_data, user):
+    form, post = _save(form_data, user, _jpeg())
+    assert post is not None, form.errors
+    with post.image.open("rb") as file:
+        content = file.read()
+    assert b"Exif" not in content and "Секретная".encode() not in content, (
+        "Убедитесь, что из загруженного изображения удаляются данные EXIF."
+    )
+    with Image.open(BytesIO(content)) as image:
+        assert image.size == (40, 20)
+
+
+def test_rotated_jpeg_keeps_only_orientation(form_data, user):
+    form, post = _save(form_data, user, _jpeg(orientation=6))
+    assert post is not None, form.errors
+    with post.image.open("rb") as file, Image.open(file) as image:
+        assert image.size == (40, 20)
+        assert dict(image.getexif()) == {ORIENTATION: 6}, (
+            "Убедитесь, что у повёрнутого снимка из EXIF остаётся "
+            "только ориентация."
+        )
+    assert (post.image_meta["width"], post.image_meta["height"]) == (20, 40)
+
+
+def test_jpeg_fill_bytes_and_icc_profile_kept(form_data, user):
+    content = _jpeg()
+    icc = b"\xff\xe2" + struct.pack(">H", 2 + 14) + b"ICC_PROFILE\x00\x01\x01"
+    # Байты-заполнители 0xFF перед маркером допустимы.
+    content = content[:2] + icc + b"\xff\xff" + content[2:]
+    form, post = _save(form_data, user, content)
+    assert post is not None, form.errors
+    with post.image.open("rb") as file:
+        assert b"ICC_PROFILE" in file.read(), (
+            "Убедитесь, что цветовой профиль ICC (APP2) сохраняется."
+        )
+
+
+def test_webp_metadata_chunks_are_stripped(form_data, user):
+    if not features.check("webp"):
+        pytest.skip("Pillow собран без поддержки WebP.")
+    exif = Image.Exif()
+    exif[MAKE] = "Секретная камера"
+    buffer = BytesIO()
+    Image.new("RGB", (8, 8)).save(buffer, format="WEBP", exif=exif,
+                                  xmp=b"<x:xmpmeta>secret</x:xmpmeta>")
+    form, post = _save(form_data, user, buffer.getvalue(), name="photo.webp")
+    assert post is not None, form.errors
+    with post.image.open("rb") as file:
+        content = file.read()
+    assert b"EXIF" not in content and b"secret" not in content, (
+        "Убедитесь, что из WebP удаляются чанки EXIF и XMP."
+    )
+    assert struct.unpack("<I", content[4:8])[0] == len(content) - 8
+    with Image.open(BytesIO(content)) as image:
+        image.load()
+        assert image.size == (8, 8)
+
+
+def test_png_text_chunks_are_stripped(form_data, user):
+    form, post = _save(form_data, user, _png(4, 4, b"Author\x00secret"),
+                       name="photo.png")
+    assert post is not None, form.errors
+    with post.image.open("rb") as file:
+        content = file.read()
+    assert b"secret" not in content
+    with Image.open(BytesIO(content)) as image:
+        image.load()
+        assert image.size == (4, 4)
+
+
+@pytest.mark.parametrize("size, max_pixels, code", [
+    # Больше Image.MAX_IMAGE_PIXELS: Pillow предупреждает о «бомбе».
+    ((10_000, 10_000), 10 ** 12, "invalid_image"),
+    # Больше 2 * Image.MAX_IMAGE_PIXELS: Pillow отказывается открывать.
+    ((100_000, 100_000), 10 ** 12, "invalid_image"),
+    ((5000, 5000), 1000 * 1000, "too_many_pixels"),
+], ids=["bomb warning", "bomb error", "too many pixels"])
+def test_huge_images_rejected(form_data, user, settings, size, max_pixels,
+                              code):
+    settings.IMAGE_UPLOAD_MAX_PIXELS = max_pixels
+    # В файле только заголовок с размерами, без пикселей: проверка
+    # не должна их распаковывать.
+    content = _png_header(*size) + _png_chunk(b"IEND", b"")
+    form, post = _save(form_data, user, content, name="bomb.png")
+    assert post is None
+    assert [error.code for error in form.errors.as_data()["image"]] == [
+        code
+    ], "Убедитесь, что изображения с огромным числом пикселей отклоняются."
+
+
+def test_oversized_upload_rejected(user_client, form_data, settings):
+    settings.UPLOAD_MAX_SIZE = 1024
+    response = user_client.post("/posts/create/", data={
+        **form_data,
+        "image": SimpleUploadedFile("photo.jpg", _jpeg(size=(400, 400))),
+    })
+    assert response.status_code == 200
+    assert "image" in response.context["form"].errors, (
+        "Убедитесь, что файлы больше UPLOAD_MAX_SIZE не принимаются."
+    )
+    assert not Post.objects.exists()